@@ -1,22 +1,32 @@
 """Web application UI module of NirmatAI."""
 
 ##### IMPORT LIBRARIES #####
+import functools
+import hashlib
+import html
 import logging
 import os
+import queue
 import re
+import shutil
+import string
 import textwrap
 import time
-from io import BytesIO
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from io import BytesIO, StringIO, TextIOWrapper
 from time import strftime
+from typing import TypedDict
 
 import mlflow
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
 import streamlit as st
 from nirmatai_sdk.core import NirmatAI
-from openpyxl import load_workbook
-from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
-from openpyxl.utils import get_column_letter
 from pgpt_python.types import HealthResponse
+from pyarrow import csv as pacsv
 from streamlit.runtime.uploaded_file_manager import UploadedFile
 from utils.css_module import custom_css, local_css
 from utils.lock_utils import (
@@ -24,6 +34,7 @@ from utils.lock_utils import (
     get_lock_info,
     get_remaining_lock_time,
     is_locked,
+    next_poll_interval,
     release_lock,
     remove_user_folder,
     update_lock_duration,
@@ -53,9 +64,14 @@ st.set_page_config(
     initial_sidebar_state="expanded",
 )
 
+@functools.lru_cache(maxsize=128)
+def _ensure_dir(path: str) -> None:
+    """Create a directory once; repeated calls become a cache lookup."""
+    os.makedirs(path, exist_ok=True)
+
+
 # Create directory for uploaded files
-if not os.path.exists("uploaded_files"):
-    os.makedirs("uploaded_files")
+_ensure_dir("uploaded_files")
 
 # Check if the environment variable 'NIRMATAI_BASE_URL' is set
 BASE_URL = os.getenv(
@@ -120,8 +136,23 @@ if "logged_in" not in st.session_state:
     st.session_state["username"] = ""
 
 
+# Fingerprint a DataFrame for st.cache_data without pickling the whole frame
+def _hash_dataframe(df: pd.DataFrame) -> bytes:
+    """Return a stable digest of a DataFrame for cache keying.
+
+    The schema (column labels and dtypes) is fed into the digest along
+    with the row hashes: hash_pandas_object covers values only, so two
+    frames that differ just in column names would otherwise collide.
+    """
+    digest = hashlib.md5(
+        str((tuple(df.columns), tuple(map(str, df.dtypes)))).encode()
+    )
+    digest.update(pd.util.hash_pandas_object(df, index=True).values)
+    return digest.digest()
+
+
 # Helper function to convert DataFrame to CSV
-@st.cache_data
+@st.cache_data(max_entries=8, hash_funcs={pd.DataFrame: _hash_dataframe})
 def convert_df_to_csv(df: pd.DataFrame) -> bytes | None:
     """Convert a DataFrame to a CSV and return it as UTF-8 encoded bytes.
 
@@ -137,21 +168,119 @@ def convert_df_to_csv(df: pd.DataFrame) -> bytes | None:
     try:
         if df.empty:
             return None
-        csv_data = df.to_csv(index=False)
-        return csv_data.encode("utf-8") if csv_data else None
+        buffer = BytesIO()
+        try:
+            # Serialize through Arrow's multi-threaded C++ CSV writer
+            pacsv.write_csv(
+                pa.Table.from_pandas(df, preserve_index=False), buffer
+            )
+        except pa.ArrowException:
+            # Mixed object columns may not convert cleanly; fall back to
+            # pandas, encoding into the byte buffer in bounded chunks
+            buffer = BytesIO()
+            text_buffer = TextIOWrapper(buffer, encoding="utf-8", newline="")
+            df.to_csv(text_buffer, index=False, chunksize=50_000)
+            text_buffer.detach()  # Flush without closing the byte buffer
+        return buffer.getvalue() or None
     except Exception:
         st.error("Error converting to CSV.")
         return None
 
 
+def _escape_html_array(array: pa.ChunkedArray) -> pa.ChunkedArray:
+    """Escape the HTML special characters of a string array in C++."""
+    array = pc.replace_substring(array, "&", "&amp;")
+    array = pc.replace_substring(array, "<", "&lt;")
+    return pc.replace_substring(array, ">", "&gt;")
+
+
+def _df_to_html_fast(df: pd.DataFrame) -> bytes:
+    """Assemble a DataFrame HTML table from Arrow-cast string columns.
+
+    Casting and escaping run in Arrow's vectorized kernels instead of
+    pandas' per-cell Python formatter.
+    """
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    columns = [
+        _escape_html_array(
+            pc.fill_null(pc.cast(column, pa.string()), "")
+        ).to_pylist()
+        for column in table.columns
+    ]
+
+    header = "".join(
+        f"<th>{html.escape(str(name))}</th>" for name in df.columns
+    )
+    rows = [
+        "<tr>" + "".join(f"<td>{value}</td>" for value in row) + "</tr>"
+        for row in zip(*columns, strict=True)
+    ]
+    document = (
+        '<table border="1" class="dataframe">'
+        f"<thead><tr>{header}</tr></thead>"
+        "<tbody>" + "".join(rows) + "</tbody></table>"
+    )
+    return document.encode("utf-8")
+
+
+# Helper function to convert DataFrame to HTML
+@st.cache_data(
+    show_spinner=False,
+    max_entries=8,
+    hash_funcs={pd.DataFrame: _hash_dataframe},
+)
+def convert_df_to_html(df: pd.DataFrame) -> bytes:
+    """Render a DataFrame as UTF-8 encoded HTML bytes.
+
+    The result is cached so widget interactions do not re-render an
+    unchanged result set.
+    """
+    try:
+        return _df_to_html_fast(df)
+    except Exception:
+        # Mixed object columns may not cast cleanly; fall back to pandas
+        return df.to_html().encode("utf-8")
+
+
+# Result columns that get a wider column in the Excel export
+CUSTOM_COLUMNS = frozenset(
+    {
+        "Requirement",
+        "Potential Means of Compliance",
+        "Rationale",
+        "Ref. to Doc",
+    }
+)
+
+# Result columns rendered in bold in the Excel export
+BOLD_COLUMNS = frozenset({"Label", "Compliance status"})
+
+
 # Helper function to convert DataFrame to Excel
-def convert_df_to_excel(df: pd.DataFrame) -> bytes | None:
+@st.cache_data(
+    show_spinner=False,
+    max_entries=8,
+    hash_funcs={pd.DataFrame: _hash_dataframe},
+)
+def convert_df_to_excel(
+    df: pd.DataFrame,
+    stats_df: pd.DataFrame | None = None,
+    stats_sheet_name: str = "General Statistics",
+) -> bytes | None:
     """Convert a DataFrame to an Excel.
 
+    The workbook is streamed with xlsxwriter's constant_memory mode, so
+    peak memory stays at roughly one row no matter how large the result
+    set is. When ``stats_df`` is given it is written as a leading sheet
+    in the same pass, so the workbook is never re-opened to append it.
+    The result is cached so identical DataFrames skip re-serialization.
     If the DataFrame is empty or invalid, it returns None.
 
     Args:
         df (pd.DataFrame): DataFrame to be converted.
+        stats_df (pd.DataFrame | None): Optional statistics DataFrame
+            written as the first sheet of the workbook.
+        stats_sheet_name (str): Name of the statistics sheet.
 
     Returns:
         bytes | None: Encoded in UTF-8 as bytes, or None.
@@ -159,61 +288,98 @@ def convert_df_to_excel(df: pd.DataFrame) -> bytes | None:
     try:
         output = BytesIO()
 
-        # Use 'openpyxl' engine
-        with pd.ExcelWriter(output, engine="openpyxl") as writer:
-            df.to_excel(writer, index=False, sheet_name="Results")
+        # Stream rows to the buffer instead of building the workbook in RAM
+        with pd.ExcelWriter(
+            output,
+            engine="xlsxwriter",
+            engine_kwargs={"options": {"constant_memory": True}},
+        ) as writer:
+            workbook = writer.book
 
-            # Access the workbook and sheet objects
-            worksheet = writer.sheets["Results"]
-
-            # Define custom column widths for specific columns
-            custom_columns = [
-                "Requirement",
-                "Potential Means of Compliance",
-                "Rationale",
-                "Ref. to Doc",
-            ]
+            # Column widths for the default and the wider custom columns
             default_width = 30
             custom_width = 50
 
-            # Set column widths based on column name
-            for idx, col in enumerate(df.columns):
-                column_letter = get_column_letter(idx + 1)
-                if col in custom_columns:
-                    worksheet.column_dimensions[column_letter].width = custom_width
-                else:
-                    worksheet.column_dimensions[column_letter].width = default_width
+            # Create the shared formats once instead of styling cell by cell
+            bold_fmt = workbook.add_format(
+                {"bold": True, "font_size": 12, "font_name": "Arial"}
+            )
+            header_fmt = workbook.add_format(
+                {
+                    "bold": True,
+                    "font_size": 14,
+                    "font_name": "Arial",
+                    "align": "center",
+                }
+            )
 
-            # Set the row height for all rows
-            for row in worksheet.iter_rows(
-                min_row=1, max_row=len(df) + 1, min_col=1, max_col=len(df.columns)
-            ):
-                worksheet.row_dimensions[row[0].row].height = 35
+            # Write the statistics sheet first so it leads the workbook
+            if stats_df is not None:
+                stats_header_fmt = workbook.add_format(
+                    {
+                        "bold": True,
+                        "font_size": 14,
+                        "font_color": "#FFFFFF",
+                        "bg_color": "#4F81BD",
+                        "align": "center",
+                        "valign": "vcenter",
+                    }
+                )
+                # Shared alternating row formats, indexed by row parity
+                stats_row_fmts = (
+                    workbook.add_format({"bg_color": "#FFFFFF", "border": 1}),
+                    workbook.add_format({"bg_color": "#D9E2F3", "border": 1}),
+                )
+
+                stats_sheet = workbook.add_worksheet(stats_sheet_name)
 
-            # Define the columns where the text should be bold
-            bold_columns = ["Label", "Compliance status"]
-            bold_font = Font(bold=True, size=12, name="Arial")
+                # Auto-adjust column widths from one whole-frame string pass
+                header_lengths = pd.Series(
+                    [len(str(col)) for col in stats_df.columns],
+                    index=stats_df.columns,
+                )
+                if len(stats_df):
+                    cell_lengths = stats_df.astype(str).map(len).max()
+                    col_widths = cell_lengths.clip(lower=header_lengths) + 2
+                else:
+                    col_widths = header_lengths + 2
+                for idx, col in enumerate(stats_df.columns):
+                    stats_sheet.set_column(idx, idx, col_widths[col])
+
+                stats_sheet.write_row(0, 0, stats_df.columns, stats_header_fmt)
+                for row_idx, row in enumerate(
+                    stats_df.itertuples(index=False, name=None), start=1
+                ):
+                    stats_sheet.write_row(
+                        row_idx, 0, row, stats_row_fmts[row_idx % 2]
+                    )
 
-            # Iterate over each column and apply bold formatting for specific columns
+            worksheet = workbook.add_worksheet("Results")
+
+            # Set column widths and bold columns in a single pass
             for idx, col in enumerate(df.columns):
-                if col in bold_columns:
-                    # Get the column letter
-                    column_letter = get_column_letter(idx + 1)
-                    # Apply bold font to all cells in this column
-                    for cell in worksheet[column_letter]:
-                        cell.font = bold_font
+                width = custom_width if col in CUSTOM_COLUMNS else default_width
+                worksheet.set_column(
+                    idx, idx, width, bold_fmt if col in BOLD_COLUMNS else None
+                )
 
-            header_font = Font(bold=True, size=14, name="Arial")
-            center_alignment = Alignment(horizontal="center")
+            # Set the row height for all rows with one call
+            worksheet.set_default_row(35)
 
-            for cell in worksheet["1:1"]:  # Apply to the first row (header)
-                cell.font = header_font
-                cell.alignment = center_alignment
+            # Write the header row with the header format
+            worksheet.write_row(0, 0, df.columns, header_fmt)
+
+            # Stream the data rows in order; missing values become blanks
+            cleaned = df.astype(object).where(df.notna(), None)
+            for row_idx, row in enumerate(
+                cleaned.itertuples(index=False, name=None), start=1
+            ):
+                worksheet.write_row(row_idx, 0, row)
 
         return output.getvalue()
     except ImportError:
         st.error(
-            "The 'openpyxl' module is not installed. Please install it using 'pip install openpyxl'."  # noqa: E501
+            "The 'xlsxwriter' module is not installed. Please install it using 'pip install xlsxwriter'."  # noqa: E501
         )
         return None
     except Exception as e:
@@ -222,29 +388,46 @@ def convert_df_to_excel(df: pd.DataFrame) -> bytes | None:
 
 def generate_log_file(
     process_logs : list[dict[str, str | int | float | None]],
-    file_name : str ="requirement_processing_log.txt"
-) -> None:
+    file_name : str ="requirement_processing_log.txt",
+    uploaded_doc_names : list[str] | None = None,
+    requirements_name : str | None = None,
+) -> dict[str, str | int]:
     """Generate a log file with statistics related to requirement processing.
 
     :param process_logs: List of dictionaries containing process log data
     :param file_name: Name of the log file to be generated
+    :param uploaded_doc_names: Names of the uploaded documents; read from
+                               the session state when not given, so worker
+                               threads can pass a snapshot instead.
+    :param requirements_name: Name of the uploaded requirements file; read
+                              from the session state when not given.
+    :return: The summary statistics that were written to the log file,
+             so callers do not have to re-parse the file.
     """
+    # Fall back to the session state when running on the script thread
+    if uploaded_doc_names is None:
+        uploaded_doc_names = list(st.session_state.get("uploaded_docs") or ())
+    if requirements_name is None:
+        requirements_name = st.session_state.get("requirements_file_name")
+
     # Get the current timestamp
     timestamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
 
+    # Build one DataFrame so the summary reductions run at C level
+    logs_df = pd.DataFrame(process_logs)
+
     # Initialize counters
-    total = len(process_logs)
-    success_count = sum(
-        1 for log in process_logs if log["Processing Status"] == "Success"
-    )
+    total = len(logs_df)
+    if total:
+        success_count = int((logs_df["Processing Status"] == "Success").sum())
+        # Calculate total processing time; non-numeric entries are dropped
+        total_processing_time = float(
+            pd.to_numeric(logs_df["Processing Time"], errors="coerce").sum()
+        )
+    else:
+        success_count = 0
+        total_processing_time = 0.0
     failure_count = total - success_count
-
-    # Calculate total processing time
-    total_processing_time = sum(
-        log["Processing Time"]
-        for log in process_logs
-        if isinstance(log["Processing Time"], int | float)  # Ensure numeric type
-    )
     hours, remainder = divmod(total_processing_time, 3600)
     minutes, seconds = divmod(remainder, 60)
 
@@ -262,141 +445,179 @@ def generate_log_file(
     # Format the log
     max_width = 120
 
-    log_content = []
+    # Reuse wrapper instances so the wrapping regex is compiled once
+    req_wrapper = textwrap.TextWrapper(
+        width=max_width - len("  Requirement: "),
+        subsequent_indent=" " * 8  # Indent subsequent lines for alignment
+    )
+    rat_wrapper = textwrap.TextWrapper(
+        width=max_width - len("  Rationale: "),
+        subsequent_indent=" " * 8  # Indent subsequent lines for alignment
+    )
+
+    # Buffered writes instead of collecting lines and joining at the end
+    buf = StringIO()
+    write = buf.write
+
     # Generate the header with dynamic width
     separator = "=" * max_width
-    log_content.append(separator)
-    log_content.append("NirmatAI Requirement Processing Log File".center(max_width))
-    log_content.append(f"Generated on: {timestamp}".center(max_width))
-    log_content.append(separator + "\n\n")
-
-    log_content.append("----- Uploaded Documents -----".center(max_width))
-    if st.session_state.get("uploaded_docs"):
-        # Sort and group uploaded documents by file type
-        uploaded_docs = sorted(
-            st.session_state["uploaded_docs"],
-            key=lambda x: (x.name.split(".")[-1].lower(), x.name.lower())
-        )
-        grouped_docs : dict[str, list[str]]= {"pdf": [], "docx": [], "txt": []}
-        for doc in uploaded_docs:
-            ext = doc.name.split(".")[-1].lower()
-            if ext in grouped_docs:
-                grouped_docs[ext].append(doc.name)
-
-        for file_type, docs in grouped_docs.items():
+    write(separator + "\n")
+    write("NirmatAI Requirement Processing Log File".center(max_width) + "\n")
+    write(f"Generated on: {timestamp}".center(max_width) + "\n")
+    write(separator + "\n\n\n")
+
+    write("----- Uploaded Documents -----".center(max_width) + "\n")
+    if uploaded_doc_names:
+        # Group uploaded documents by file type in a single pass
+        known_types = ("pdf", "docx", "txt")
+        grouped_docs: dict[str, list[str]] = defaultdict(list)
+        for doc_name in uploaded_doc_names:
+            ext = os.path.splitext(doc_name)[1][1:].lower()
+            if ext in known_types:
+                grouped_docs[ext].append(doc_name)
+
+        for file_type in known_types:
+            # Sort each bucket by name instead of sorting the whole list
+            docs = sorted(grouped_docs[file_type], key=str.lower)
             if docs:
-                log_content.append(f"Uploaded {file_type.upper()} Files:")
+                write(f"Uploaded {file_type.upper()} Files:\n")
                 for idx, doc_name in enumerate(docs, start=1):
-                    log_content.append(f"   {idx}. Name: {doc_name}")
+                    write(f"   {idx}. Name: {doc_name}\n")
             else:
-                log_content.append(f"No {file_type.upper()} files uploaded.")
+                write(f"No {file_type.upper()} files uploaded.\n")
     else:
-        log_content.append("No uploaded documents.")
-    log_content.append("\n")
-    log_content.append("----- Uploaded Requirements -----".center(max_width))
-    if st.session_state.get("requirements_file_name"):
-        log_content.append(f"Name: {st.session_state["requirements_file_name"]}")
+        write("No uploaded documents.\n")
+    write("\n\n")
+    write("----- Uploaded Requirements -----".center(max_width) + "\n")
+    if requirements_name:
+        write(f"Name: {requirements_name}\n")
     else:
-        log_content.append("No uploaded requirements.")
-
-    log_content.append("\n\n")
-    log_content.append("----- Summary Statistics -----".center(max_width))
-    log_content.append(f"Total Requirements Processed: {total}")
-    log_content.append(f"Successfully Processed: {success_count}")
-    log_content.append(f"Failed Requirements: {failure_count}")
-    log_content.append(f"Processing Duration: {formatted_time}")
-    log_content.append(
-        f"Average Processing Duration per Requirement: {formatted_avg_time}\n"
+        write("No uploaded requirements.\n")
+
+    write("\n\n\n")
+    write("----- Summary Statistics -----".center(max_width) + "\n")
+    write(f"Total Requirements Processed: {total}\n")
+    write(f"Successfully Processed: {success_count}\n")
+    write(f"Failed Requirements: {failure_count}\n")
+    write(f"Processing Duration: {formatted_time}\n")
+    write(
+        f"Average Processing Duration per Requirement: {formatted_avg_time}\n\n"
     )
 
-    log_content.append("----- Detailed Log -----".center(max_width))
+    write("----- Detailed Log -----".center(max_width) + "\n")
     for idx, log in enumerate(process_logs, start=1):
-        # Specify the maximum width for wrapping lines
-
-        log_content.append(f"{idx}. Requirement ID: {log['Requirement ID']}")
-
-        # Format the Requirement field with wrapping
-        requirement_text = textwrap.fill(
-            str(log["Requirement"]),
-            width=max_width - len("  Requirement: "),
-            subsequent_indent=" " * 8  # Indent subsequent lines for alignment
+        # Wrap the free-text fields, then emit the whole record in one write
+        requirement_text = req_wrapper.fill(str(log["Requirement"]))
+        rationale_text = rat_wrapper.fill(str(log["Rationale"]))
+        write(
+            f"{idx}. Requirement ID: {log['Requirement ID']}\n"
+            f"   Requirement: {requirement_text}\n"
+            f"   Compliance Status: {log['Compliance Status']}\n"
+            f"   Rationale: {rationale_text}\n"
+            f"   Processing Status: {log['Processing Status']}\n"
+            f"   Processing Time: {log['Processing Time']:.2f} seconds\n"
+            f"   Error: {log['Error'] or 'None'}\n\n"
         )
 
-        # Append the formatted rationale to the log content
-        log_content.append(f"   Requirement: {requirement_text}")
-        log_content.append(f"   Compliance Status: {log['Compliance Status']}")
-
-        # Format the Rationale field with wrapping
-        rationale_text = textwrap.fill(
-            str(log["Rationale"]),
-            width=max_width - len("  Rationale: "),
-            subsequent_indent=" " * 8  # Indent subsequent lines for alignment
-        )
-
-        # Append the formatted rationale to the log content
-        log_content.append(f"   Rationale: {rationale_text}")
-        log_content.append(f"   Processing Status: {log['Processing Status']}")
-        log_content.append(f"   Processing Time: {log['Processing Time']:.2f} seconds")
-        log_content.append(f"   Error: {log['Error'] if log['Error'] else 'None'}")
-        log_content.append("")
-
-    log_content.append("----- Error Summary -----".center(max_width))
-    # Collect all errors in one go
-    errors = [
-        f"{log['Requirement ID']}: {log['Error'] if log['Error'] else 'No error provided'}" # noqa: E501
-        for log in process_logs
-        if log["Processing Status"] == "Failure"
-    ]
+    write("----- Error Summary -----".center(max_width) + "\n")
+    # Collect all errors in one vectorized pass
+    if total:
+        failed = logs_df.loc[logs_df["Processing Status"] == "Failure"]
+        errors = (
+            failed["Requirement ID"].astype(str)
+            + ": "
+            + failed["Error"]
+            .fillna("No error provided")
+            .replace("", "No error provided")
+        ).tolist()
+    else:
+        errors = []
 
-    # Add errors to log_content or a default message if no errors are found
-    log_content.extend(errors if errors else ["No error occurred"])
+    # Write errors to the buffer or a default message if no errors are found
+    write("\n".join(errors if errors else ["No error occurred"]) + "\n")
 
 
-    log_content.append("\n\n" + separator)
+    write("\n\n" + separator + "\n")
     endoffile = "End of the NirmatAI Log File"
-    log_content.append(endoffile.center(max_width))
-    log_content.append(separator)
-    log_content.append(
-        "© 2024 NirmatAI CertX AG. All rights reserved.".center(max_width)
+    write(endoffile.center(max_width) + "\n")
+    write(separator + "\n")
+    write(
+        "© 2024 NirmatAI CertX AG. All rights reserved.".center(max_width) + "\n"
     )
-    log_content.append(
+    write(
         "This document contains proprietary information of CertX AG.".center(max_width)
+        + "\n"
     )
-    log_content.append(
+    write(
         "Unauthorized use, disclosure, or distribution is strictly prohibited.".center(max_width) # noqa: E501
+        + "\n"
     )
 
-    # Write to file
-    with open(file_name, "w") as file:
-        file.write("\n".join(log_content))
+    # Write to file in one buffered call
+    with open(file_name, "w", buffering=1 << 20) as file:
+        file.write(buf.getvalue())
 
     logging.info(f"Log file '{file_name}' generated successfully.")
 
+    # Hand the summary statistics back so they need not be re-parsed
+    return {
+        "Total Requirements Processed": total,
+        "Successfully Processed": success_count,
+        "Failed Requirements": failure_count,
+        "Processing Duration": formatted_time,
+        "Average Processing Duration": formatted_avg_time,
+    }
+
+# Compiled once; pulls every summary statistic out of the log in one pass
+_LOG_STATS_PATTERN = re.compile(
+    r"^(Total Requirements Processed|Successfully Processed"
+    r"|Failed Requirements|Processing Duration"
+    r"|Average Processing Duration per Requirement):\s*(.*)$",
+    re.MULTILINE,
+)
+
+# Statistic fields as (log key, display label, cast) triples
+_LOG_STATS_FIELDS = (
+    ("Total Requirements Processed", "Total Requirements Processed", int),
+    ("Successfully Processed", "Successfully Processed", int),
+    ("Failed Requirements", "Failed Requirements", int),
+    ("Processing Duration", "Processing Duration", str),
+    (
+        "Average Processing Duration per Requirement",
+        "Average Processing Duration",
+        str,
+    ),
+)
+
 def extract_statistics_from_log(
-    log_file: str,
+    log_file: str | dict[str, str | int],
     classes: tuple[int, int, int, int, int]
 ) -> pd.DataFrame:
-    """Extract the statistics section from the log file."""
-    statistics = []
-    with open(log_file) as file:
-        for line in file:
-            if "Total Requirements Processed:" in line:
-                total_processed = line.split(":")[1].strip()
-                statistics.append(
-                    ["Total Requirements Processed", int(total_processed)]
-                )
-            elif "Successfully Processed:" in line:
-                success_count = line.split(":")[1].strip()
-                statistics.append(["Successfully Processed", int(success_count)])
-            elif "Failed Requirements:" in line:
-                failed_count = line.split(":")[1].strip()
-                statistics.append(["Failed Requirements", int(failed_count)])
-            elif "Processing Duration:" in line:
-                duration = line.split(":")[1].strip()
-                statistics.append(["Processing Duration", duration])
-            elif "Average Processing Duration per Requirement:" in line:
-                avg_duration = line.split(":")[1].strip()
-                statistics.append(["Average Processing Duration", avg_duration])
+    """Extract the statistics section from the log file.
+
+    Accepts either the statistics dict returned by generate_log_file
+    (no file round-trip) or a path to a log file to parse.
+    """
+    if isinstance(log_file, dict):
+        stats = log_file
+    else:
+        with open(log_file) as file:
+            content = file.read()
+
+        # One regex scan over the file instead of per-line substring tests
+        matches = {
+            match.group(1): match.group(2).strip()
+            for match in _LOG_STATS_PATTERN.finditer(content)
+        }
+        stats = {
+            label: cast(matches[key])
+            for key, label, cast in _LOG_STATS_FIELDS
+            if key in matches
+        }
+
+    statistics: list[list[str | int]] = [
+        [label, value] for label, value in stats.items()
+    ]
     statistics.append(["Total Requirements", classes[0]])
     statistics.append(["Full Compliance", classes[1]])
     statistics.append(["Minor Non-Conformity", classes[2]])
@@ -404,103 +625,6 @@ def extract_statistics_from_log(
     statistics.append(["Unassigned Compliance", classes[4]])
     return pd.DataFrame(statistics, columns=["General Statistics", "Values"])
 
-def add_sheet_to_excel(
-    existing_excel: bytes | None,
-    new_sheet_df: pd.DataFrame,
-    sheet_name: str
-) -> bytes | None:
-    """A new sheet to an existing Excel file stored as bytes, with enhanced formatting.
-
-    Args:
-        existing_excel (bytes): The existing Excel file in bytes.
-        new_sheet_df (pd.DataFrame): The DataFrame to add as a new sheet.
-        sheet_name (str): The name of the new sheet to be added.
-
-    Returns:
-        bytes: The updated Excel file with the new sheet.
-    """
-    try:
-        # Load the existing Excel workbook from the bytes
-        if existing_excel:
-            with BytesIO(existing_excel) as input_file:
-                workbook = load_workbook(input_file)
-
-            # Check if the sheet name already exists
-            if sheet_name in workbook.sheetnames:
-                raise ValueError(
-                    f"Sheet '{sheet_name}' already exists in the workbook."
-                )
-
-            # Add the new sheet to the workbook
-            sheet = workbook.create_sheet(title=sheet_name)
-
-            # Write DataFrame content to the new sheet
-            # Header styling
-            header_font = Font(bold=True, size=14, color="FFFFFF")
-            header_fill = PatternFill(
-                start_color="4F81BD",
-                end_color="4F81BD",
-                fill_type="solid"
-            )
-            center_alignment = Alignment(
-                horizontal="center",
-                vertical="center"
-            )
-
-            # Apply header styles and write headers
-            for col_idx, col_name in enumerate(new_sheet_df.columns, start=1):
-                cell = sheet.cell(row=1, column=col_idx, value=col_name)
-                cell.font = header_font
-                cell.fill = header_fill
-                cell.alignment = center_alignment
-
-            # Write DataFrame rows with alternating colors
-            row_fill_1 = PatternFill(
-                start_color="D9E2F3",
-                end_color="D9E2F3",
-                fill_type="solid"
-            )
-            row_fill_2 = PatternFill(
-                start_color="FFFFFF",
-                end_color="FFFFFF",
-                fill_type="solid"
-            )
-
-            thin_border = Border(
-                left=Side(style="thin"),
-                right=Side(style="thin"),
-                top=Side(style="thin"),
-                bottom=Side(style="thin"),
-            )
-
-            for row_idx, row in enumerate(new_sheet_df.itertuples(index=False), start=2): # noqa: E501
-                fill = row_fill_1 if row_idx % 2 == 0 else row_fill_2
-                for col_idx, value in enumerate(row, start=1):
-                    cell = sheet.cell(row=row_idx, column=col_idx, value=value)
-                    cell.fill = fill
-                    cell.border = thin_border
-
-            # Auto-adjust column widths
-            for col_idx, col_name in enumerate(new_sheet_df.columns, start=1):
-                max_length = max(len(str(col_name)), *(len(str(row[col_idx - 1])) for row in new_sheet_df.itertuples(index=False))) # noqa: E501
-                sheet.column_dimensions[get_column_letter(col_idx)].width = max_length + 2 # noqa: E501
-
-            # Move the new sheet to the first position
-            workbook._sheets.insert(0, workbook._sheets.pop(-1))
-
-            # Save the workbook to bytes
-            output = BytesIO()
-            workbook.save(output)
-            output.seek(0)  # Reset pointer for reading
-            return output.getvalue()
-        else:
-            return None
-
-    except Exception as e:
-        print(f"Error adding sheet to Excel with formatting: {e}")
-        return None
-
-
 # Helper function to validate file path
 def validate_file_path(base_dir: str, filename: str) -> str | None:
     """Validates and returns the full file path if valid; otherwise, None."""
@@ -514,14 +638,29 @@ def validate_file_path(base_dir: str, filename: str) -> str | None:
         return None
 
 
+# Compiled once at import; matches every character that is not allowed
+_FILENAME_SANITIZER = re.compile(r"[^A-Za-z0-9_\-.]")
+
+# ASCII translation table mapping every disallowed character to "_"
+_ALLOWED_CHARS = frozenset(string.ascii_letters + string.digits + "_-.")
+_FILENAME_TRANS = str.maketrans(
+    {char: "_" for char in map(chr, range(128)) if char not in _ALLOWED_CHARS}
+)
+
+# Usernames must be at least 8 characters long
+_USERNAME_RE = re.compile(r".{8,}")
+
+
 def sanitize_filename(filename: str) -> str:
     """Remove any dangerous characters from the filename.
 
     That could potentially cause path traversal or other security issues.
     Allow only alphanumeric characters, dashes, and underscores.
     """
-    # Replace any character that is an unwanted character
-    return re.sub(r"[^A-Za-z0-9_\-.]", "_", filename)
+    # ASCII names take the translate fast path; others fall back to the regex
+    if filename.isascii():
+        return filename.translate(_FILENAME_TRANS)
+    return _FILENAME_SANITIZER.sub("_", filename)
 
 
 # User authentication (placeholder for real authentication)
@@ -534,9 +673,14 @@ def login() -> None:
     """
     st.session_state["logged_in"] = True
     st.session_state["username"] = st.session_state["input_username"]
+    # Sanitize once per login; tab3 reruns reuse the cached value
+    st.session_state["username_safe"] = sanitize_filename(
+        st.session_state["username"]
+    )
     st.session_state["current_lockusername"] = None
     st.session_state["NirmatAI_file_name"] = None
     st.session_state["NirmatAI_log_file_name"] = None
+    st.session_state["log_stats"] = None
     st.session_state["Total_exec_time"]  = None
     st.session_state["Avg_exec_time_per_req"]  = None
     st.rerun()  # Rerun to update the UI
@@ -551,21 +695,26 @@ def logout() -> None:
     A rerun is triggered to update the UI based on the new session state.
     """
     remove_user_folder(st.session_state["username"])
+    # The user folders are gone; forget that they were ensured
+    _ensure_dir.cache_clear()
     locked = is_locked()
     lock_username, _ = get_lock_info()
     if locked and lock_username == st.session_state["username"]:
         release_lock()
     st.session_state["logged_in"] = False
     st.session_state["username"] = ""
+    st.session_state["username_safe"] = ""
     # Clear file uploader states
     st.session_state["docs_upload"] = None
     st.session_state["req_upload"] = None
-    st.session_state["uploaded_docs"] = []
+    st.session_state["uploaded_docs"] = {}
     st.session_state["requirements_df"] = None
     st.session_state["requirements_file_name"] = None
+    st.session_state["requirements_file_id"] = None
     st.session_state["current_lockusername"] = None
     st.session_state["NirmatAI_file_name"] = None
     st.session_state["NirmatAI_log_file_name"] = None
+    st.session_state["log_stats"] = None
     st.session_state["Total_exec_time"]  = None
     st.session_state["Avg_exec_time_per_req"]  = None
     st.rerun()  # Rerun to update the UI
@@ -584,7 +733,7 @@ if not st.session_state["logged_in"]:
         username = st.session_state.get("input_username", "")
         if username:
             # Check if username is at least 8 characters using regex
-            if re.fullmatch(r".{8,}", username):
+            if _USERNAME_RE.fullmatch(username):
                 # Placeholder authentication logic
                 logging.info(f"User {username} has logged in to the system")
                 login()
@@ -612,7 +761,9 @@ else:
         logout()
 
 
-def save_uploaded_file(uploadedfile: UploadedFile) -> None:
+def save_uploaded_file(
+    uploadedfile: UploadedFile, user_folder: str | None = None
+) -> None:
     """Saves an uploaded file to a user-specific folder.
 
     This function saves the uploaded file to a folder structure based on
@@ -622,14 +773,21 @@ def save_uploaded_file(uploadedfile: UploadedFile) -> None:
 
     Parameters:
     uploadedfile (UploadedFile): The file object uploaded by the user.
+    user_folder (str | None): Target folder; resolved from the session
+        state when not given, so worker threads can pass it explicitly.
     """
-    user_folder = os.path.join(
-        "uploaded_files", st.session_state["username"], "documents"
-    )
-    if not os.path.exists(user_folder):
-        os.makedirs(user_folder)
-    with open(os.path.join(user_folder, uploadedfile.name), "wb") as f:
-        f.write(uploadedfile.getbuffer())
+    if user_folder is None:
+        user_folder = os.path.join(
+            "uploaded_files", st.session_state["username"], "documents"
+        )
+    _ensure_dir(user_folder)
+    # Stream the upload to disk in 1 MB chunks instead of buffering it whole
+    uploadedfile.seek(0)
+    file_path = os.path.join(user_folder, uploadedfile.name)
+    with open(file_path, "wb", buffering=1 << 20) as f:
+        shutil.copyfileobj(uploadedfile, f, length=1 << 20)
+    # Rewind so later consumers can re-read the upload from the start
+    uploadedfile.seek(0)
 
 
 def save_requirements_file(uploadedfile: UploadedFile) -> None:
@@ -649,32 +807,15 @@ def save_requirements_file(uploadedfile: UploadedFile) -> None:
     results_folder = os.path.join(
         "uploaded_files", st.session_state["username"], "results"
     )
-    if not os.path.exists(user_folder):
-        os.makedirs(user_folder)
-    if not os.path.exists(results_folder):
-        os.makedirs(results_folder)
-    with open(os.path.join(user_folder, uploadedfile.name), "wb") as f:
-        f.write(uploadedfile.getbuffer())
-
-
-def total_number_of_reqs(file_path: str) -> int:
-    """Gets the total number of rows in the single sheet of an Excel file.
-
-    Parameters:
-    file_path (str): The path to the Excel file.
-
-    Returns:
-    int: The total number of rows in the sheet.
-    """
-    try:
-        # Load the single sheet into a DataFrame
-        df = pd.read_excel(file_path)
-
-        # Return the total number of rows
-        return len(df)
-    except Exception as e:
-        print(f"An error occurred while reading the Excel file: {e}")
-        return 0
+    _ensure_dir(user_folder)
+    _ensure_dir(results_folder)
+    # Stream the upload to disk in 1 MB chunks instead of buffering it whole
+    uploadedfile.seek(0)
+    file_path = os.path.join(user_folder, uploadedfile.name)
+    with open(file_path, "wb", buffering=1 << 20) as f:
+        shutil.copyfileobj(uploadedfile, f, length=1 << 20)
+    # Rewind so later consumers can re-read the upload from the start
+    uploadedfile.seek(0)
 
 
 def remove_saved_file(filename: str) -> None:
@@ -693,11 +834,14 @@ def remove_saved_file(filename: str) -> None:
         os.remove(file_path)
         # st.info(f"File '{filename}' has been removed.")
 
-def calculate_compliance_statistics(
+def _compliance_statistics(
     results_df: pd.DataFrame
 ) -> tuple[int, int, int, int, int]:
     """Calculate descriptive statistics for compliance status from a given DataFrame.
 
+    Plain, uncached helper: the processing worker calls it off the
+    script thread, where Streamlit's cache APIs must not be used.
+
     Args:
         results_df (pd.DataFrame): DataFrame containing a 'Compliance status' column.
 
@@ -723,18 +867,21 @@ def calculate_compliance_statistics(
                 "The DataFrame must contain a 'Compliance status' column."
             )
 
-        # Calculate the statistics
+        # Calculate the statistics with a single pass over the column
         total_requirements = len(results_df)
-        full_compliance = (
-            results_df["Compliance status"] == "full-compliance"
-        ).sum()
-        minor_non_conformity = (
-            results_df["Compliance status"] == "minor non-conformity"
-        ).sum()
-        major_non_conformity = (
-            results_df["Compliance status"] == "major non-conformity"
-        ).sum()
-        unassigned_compliance = results_df["Compliance status"].isna().sum()
+        compliance_counts = results_df["Compliance status"].value_counts(
+            dropna=False
+        )
+        full_compliance = int(compliance_counts.get("full-compliance", 0))
+        minor_non_conformity = int(
+            compliance_counts.get("minor non-conformity", 0)
+        )
+        major_non_conformity = int(
+            compliance_counts.get("major non-conformity", 0)
+        )
+        unassigned_compliance = int(
+            compliance_counts[compliance_counts.index.isna()].sum()
+        )
 
         # Log the calculated values for transparency
         logging.info("Calculated statistics successfully:")
@@ -758,6 +905,52 @@ def calculate_compliance_statistics(
         )
         raise
 
+@st.cache_data(
+    show_spinner=False,
+    max_entries=8,
+    hash_funcs={pd.DataFrame: _hash_dataframe},
+)
+def calculate_compliance_statistics(
+    results_df: pd.DataFrame
+) -> tuple[int, int, int, int, int]:
+    """Cached front for _compliance_statistics, for script-thread callers.
+
+    The result is cached per DataFrame so the metrics header and the log
+    statistics share one scan instead of recounting on every rerun.
+    """
+    return _compliance_statistics(results_df)
+
+@st.cache_data(
+    show_spinner=False,
+    max_entries=4,
+    hash_funcs={UploadedFile: lambda f: f.file_id},
+)
+def _load_requirements(uploaded_file: UploadedFile) -> pd.DataFrame:
+    """Read an uploaded requirements Excel once per upload.
+
+    The cache is keyed on file_id, which Streamlit regenerates for every
+    upload, so re-uploading a corrected file — even with the same name
+    and size — parses the new content.
+
+    Reruns triggered by unrelated widgets reuse the parsed frame instead
+    of re-parsing the workbook from the upload buffer.
+    """
+    uploaded_file.seek(0)
+    # Load the data with the Rust-backed calamine reader
+    return pd.read_excel(uploaded_file, engine="calamine")
+
+
+@st.cache_data(show_spinner=False)
+def _load_results(path: str, mtime: float) -> pd.DataFrame:
+    """Read a results CSV once per file version.
+
+    The mtime argument keys the cache so the frame is re-read only when
+    the file changes on disk. The compliance column is loaded as a
+    categorical to shrink memory and speed up the downstream counting.
+    """
+    return pd.read_csv(path, dtype={"Compliance status": "category"})
+
+
 def process_results() -> None:
     """Processes the results file and offers download options."""
     if st.session_state.get("NirmatAI_file_name") and st.session_state.get("username"):
@@ -771,8 +964,10 @@ def process_results() -> None:
             if file_path is None:
                 st.error("Invalid file path or file does not exist.")
             else:
-                # Load the results DataFrame
-                results_df = pd.read_csv(file_path)
+                # Load the results DataFrame; cached until the file changes
+                results_df = _load_results(
+                    file_path, os.path.getmtime(file_path)
+                )
 
                 # Display header and DataFrame
                 st.header("NirmatAI Results for the Processed Requirements")
@@ -784,33 +979,18 @@ def process_results() -> None:
                     compliance_vals = calculate_compliance_statistics(results_df)
 
                     # Display the statistics using columns and metrics
-                    stat_col1, stat_col2, stat_col3, stat_col4, stat_col5 = st.columns(5) # noqa: E501
-
-                    with stat_col1:
-                        st.metric(
-                            label="Total Requirements",
-                            value=compliance_vals[0]
-                        )
-                    with stat_col2:
-                        st.metric(
-                            label="Full Compliance",
-                            value=compliance_vals[1]
-                        )
-                    with stat_col3:
-                        st.metric(
-                            label="Minor Non-conformity",
-                            value=compliance_vals[2]
-                        )
-                    with stat_col4:
-                        st.metric(
-                            label="Major Non-conformity",
-                            value=compliance_vals[3]
-                        )
-                    with stat_col5:
-                        st.metric(
-                            label="Unassigned Compliance",
-                            value=compliance_vals[4]
-                        )
+                    stat_labels = (
+                        "Total Requirements",
+                        "Full Compliance",
+                        "Minor Non-conformity",
+                        "Major Non-conformity",
+                        "Unassigned Compliance",
+                    )
+                    for stat_col, stat_label, stat_value in zip(
+                        st.columns(5), stat_labels, compliance_vals,
+                        strict=True,
+                    ):
+                        stat_col.metric(label=stat_label, value=stat_value)
                 # Example: Displaying metrics
                 if (st.session_state["Total_exec_time"] is not None and
                     st.session_state["Avg_exec_time_per_req"] is not None):
@@ -831,19 +1011,18 @@ def process_results() -> None:
                 if log_file_path is None:
                     st.error("Invalid file path or file does not exist.")
                 else:
+                    # Prefer the in-memory statistics over re-parsing the log
+                    log_stats = st.session_state.get("log_stats")
                     statistics_data = extract_statistics_from_log(
-                        log_file_path,
-                        calculate_compliance_statistics(results_df)
+                        log_stats if log_stats else log_file_path,
+                        compliance_vals
                     )
                     csv_data = convert_df_to_csv(results_df)
-                    result_excel = convert_df_to_excel(results_df)
-                    # 3. Statistics'i ekle
-                    excel_data = add_sheet_to_excel(
-                        result_excel,
-                        statistics_data,
-                        "General Statistics"
+                    # Write the statistics and result sheets in one pass
+                    excel_data = convert_df_to_excel(
+                        results_df, stats_df=statistics_data
                     )
-                    html_content = results_df.to_html().encode("utf-8")
+                    html_content = convert_df_to_html(results_df)
 
                     # Ensure all data is properly converted
                     if csv_data or excel_data or html_content:
@@ -889,6 +1068,239 @@ def process_results() -> None:
         pass
 
 
+@dataclass(frozen=True)
+class UserPaths:
+    """Filesystem locations derived from the sanitized user inputs."""
+
+    docs_dir: str
+    reqs_path: str
+    results_dir: str
+
+
+def user_paths(username_safe: str, requirements_safe: str) -> UserPaths:
+    """Build the per-user folder layout once per (user, requirements) key.
+
+    The joined paths only change when the sanitized username or the
+    requirements file name changes, so they are cached in the session
+    state instead of being recomputed on every rerun.
+    """
+    key = (username_safe, requirements_safe)
+    if st.session_state.get("paths_key") != key:
+        user_root = os.path.join("uploaded_files", username_safe)
+        st.session_state["paths"] = UserPaths(
+            docs_dir=os.path.join(user_root, "documents") + os.path.sep,
+            reqs_path=os.path.join(
+                user_root, "requirements", requirements_safe
+            ),
+            results_dir=os.path.join(user_root, "results"),
+        )
+        st.session_state["paths_key"] = key
+    return st.session_state["paths"]
+
+
+class _PipelineOutcome(TypedDict, total=False):
+    """Payload returned by _run_processing_pipeline to the script thread.
+
+    Only status and broken_files are always present; the other keys are
+    filled in as the corresponding pipeline stage completes or fails.
+    """
+
+    status: str
+    broken_files: list[tuple[str, str]]
+    ingest_error: str
+    reqs_number: int
+    lock_extended: bool
+    result: pd.DataFrame
+    result_file: str
+    process_logs: list[dict[str, str | int | float | None]]
+    log_stats: dict[str, str | int]
+    result_log_file: str
+    process_error: str
+    delete_error: str
+    elapsed_time: float
+
+
+def _run_processing_pipeline(
+    base_url: str,
+    username_safe: str,
+    paths: UserPaths,
+    start_time: str,
+    uploaded_doc_names: list[str],
+    requirements_name: str | None,
+    reqs_number: int,
+    progress: queue.Queue[str],
+) -> _PipelineOutcome:
+    """Run the NirmatAI pipeline off the Streamlit script thread.
+
+    The function must not call any st.* API or touch the session state:
+    it reports progress through the queue and returns everything the
+    script thread needs to render and store afterwards.
+
+    :param base_url: Base URL of the NirmatAI service.
+    :param username_safe: Sanitized username used for the MLflow names.
+    :param paths: Per-user folder layout computed on the script thread.
+    :param start_time: Human-readable start time for the MLflow run name.
+    :param uploaded_doc_names: Snapshot of the uploaded document names.
+    :param requirements_name: Name of the uploaded requirements file.
+    :param reqs_number: Row count of the already-parsed requirements frame.
+    :param progress: Queue receiving human-readable progress messages.
+    :return: Outcome payload with the result frame, file names, process
+             logs, per-stage error strings and the elapsed time.
+    """
+    outcome: _PipelineOutcome = {"status": "ok", "broken_files": []}
+    experiment_start_time = time.time()
+
+    # Ensure safe experiment name
+    experiment_name = f"User {username_safe} NirmatAI Testing"
+    logging.info("Trying to create the mlflow with set experiment")
+    mlflow.set_experiment(experiment_name)
+    logging.info("Successfully created the mlflow experiment")
+
+    logging.info("Trying to create the mlflow run")
+    with mlflow.start_run(
+        run_name=f"{username_safe} NirmatAI Submission {start_time}"
+    ):
+        logging.info("Successfully created the mlflow run")
+        # Initialize the NirmataDemo instance
+        demo = NirmatAI(
+            base_url=base_url,
+            timeout=60 * 12,
+            verbose=3,
+        )
+        logging.debug("Successfully created the NirmatAI instance")
+
+        # Health Check of NirmatAI instance
+        # If status is ko, it means not working
+        if demo.health_check() == HealthResponse(status="ko"):
+            logging.error("Connection problem with NirmatAI")
+            outcome["status"] = "connection_error"
+            return outcome
+        progress.put(
+            f"Connection to NirmatAI is successful. Time: {strftime('%c')}"
+        )
+        logging.info("Connection to NirmatAI is successful.")
+
+        try:
+            # Ingest files safely
+            demo.ingest(directory=paths.docs_dir)
+            outcome["broken_files"] = demo.get_broken_files()
+            progress.put(
+                f"Uploaded documents are ingested. Time: {strftime('%c')}"
+            )
+            logging.info("Uploaded documents are ingested.")
+        except Exception as e:
+            logging.error(
+                f"Error occurred while ingesting the documents: {e!s}"
+            )
+            outcome["ingest_error"] = str(e)
+
+        # Load requirements and get the results
+        demo.load_requirements(reqs_file=paths.reqs_path)
+        mlflow.log_artifact(local_path=paths.reqs_path)
+
+        # The caller already knows the row count from the parsed frame
+        outcome["reqs_number"] = reqs_number
+        progress.put(f"Processing {reqs_number} requirements ...")
+        logging.info("Your requirement has been uploaded successfully.")
+
+        # Check if lock time needs to be updated
+        outcome["lock_extended"] = bool(update_lock_duration(reqs_number * 5))
+
+        try:
+            # Process the requirements
+            logging.info("Trying to start requirement processing ...")
+            result = demo.process_requirements()
+            logging.info("Finished requirement processing ...")
+            outcome["result"] = result
+
+            # Log the results of the labels; the uncached helper keeps
+            # Streamlit's cache (script-thread only) out of the worker
+            c_stats = _compliance_statistics(result)
+            metrics = {
+                "Total Requirements": c_stats[0],
+                "Full Compliance": c_stats[1],
+                "Major Non-Conformity": c_stats[2],
+                "Minor Non-Conformity": c_stats[3],
+                "Unassigned Compliance": c_stats[4]
+            }
+            for label, value in metrics.items():
+                mlflow.log_metric(label, value)
+                logging.info(f"{label}: {value}")
+
+            # Save results securely
+            saving_time = time.strftime("%Y-%m-%d-%H:%M:%S")
+            result_file = f"NirmatAI_results_{saving_time}.csv"
+            result_path = os.path.join(paths.results_dir, result_file)
+            demo.save_results(result, result_path, attach_reqs=True)
+            logging.info("Processing Requirements result saved successfully!")
+            progress.put(
+                f"Processing Requirements result saved successfully! Time: {strftime('%c')}"  # noqa: E501
+            )
+            outcome["result_file"] = result_file
+
+            # Saving results as a log
+            result_log_file = f"Result_logs_{saving_time}.txt"
+            result_log_path = os.path.join(paths.results_dir, result_log_file)
+            outcome["process_logs"] = demo.get_process_logs()
+            outcome["log_stats"] = generate_log_file(
+                outcome["process_logs"],
+                str(result_log_path),
+                uploaded_doc_names=uploaded_doc_names,
+                requirements_name=requirements_name,
+            )
+            outcome["result_log_file"] = result_log_file
+
+            mlflow.log_artifact(local_path=result_path)
+            logging.info("Dataframe logged as an artifact in MLflow.")
+            mlflow.log_artifact(local_path=result_log_path)
+            logging.info("Result Logs logged as an artifact in MLflow.")
+        except Exception as e:
+            logging.error(
+                "Error occurred while processing the requirements!"
+            )
+            outcome["process_error"] = str(e)
+
+        # Delete all ingested documents after use
+        try:
+            demo.delete_all_documents()
+            logging.info("Ingested documents deleted successfully.")
+        except Exception as e:
+            logging.error(
+                f"An error occurred while deleting the ingested documents: {e!s}"
+            )
+            outcome["delete_error"] = str(e)
+
+        # Calculate the execution time
+        elapsed_time = round(time.time() - experiment_start_time, 2)
+        outcome["elapsed_time"] = elapsed_time
+
+        # Log execution time to MLflow
+        mlflow.log_param("Execution Time", elapsed_time)
+
+    return outcome
+
+
+@st.cache_data(show_spinner=False)
+def _mockup_html() -> str:
+    """Render the constant mockup table shown in tab2.
+
+    Streamlit re-executes this whole script on every rerun, so a module
+    global would be rebuilt each time; st.cache_data is what actually
+    persists the rendered HTML across reruns.
+    """
+    return pd.DataFrame(
+        {
+            "Requirement Title": [
+                "Legal responsibility",
+                "Certification Agreement",
+                "Management of Impartiality",
+            ],
+            "Requirement": ["Req 1", "Req 2", "Req 3"],
+            "Requirement ID": ["5.1.1", "5.1.2", "5.1.3"],
+            "Potential Means of Compliance": ["MoC 1", "MoC 2", "MoC 3"],
+        }
+    ).to_html(index=False)
+
 # Main app tabs
 tab1, tab2, tab3 = st.tabs(
     ["📂 Document Upload", "📑 Requirement Upload", "📋 Review & Process"]
@@ -905,42 +1317,51 @@ with tab1:
         key="docs_upload",
     )
 
-    # Initialize session state for uploaded documents
+    # Initialize session state for uploaded documents, keyed by file name
     if "uploaded_docs" not in st.session_state:
-        st.session_state["uploaded_docs"] = []
-
-    # List previously saved files from session state
-    previously_uploaded_files = {f.name for f in st.session_state["uploaded_docs"]}
+        st.session_state["uploaded_docs"] = {}
 
     # If no files are uploaded or files are removed, clear session and remove all files
-    if not uploaded_docs and previously_uploaded_files:
-        for file_to_remove in previously_uploaded_files:
+    if not uploaded_docs and st.session_state["uploaded_docs"]:
+        for file_to_remove in st.session_state["uploaded_docs"]:
             remove_saved_file(file_to_remove)
         # Clear the session state for uploaded docs
-        st.session_state["uploaded_docs"] = []
+        st.session_state["uploaded_docs"] = {}
 
     if uploaded_docs:
-        current_uploaded_files = {f.name for f in uploaded_docs}
+        current_uploaded_files = {f.name: f for f in uploaded_docs}
+        saved_docs = st.session_state["uploaded_docs"]
 
         # Process and save only new uploaded files
-        for uploaded_file in uploaded_docs:
-            if uploaded_file.name not in previously_uploaded_files:
-                save_uploaded_file(uploaded_file)
+        new_files = [
+            uploaded_file
+            for file_name, uploaded_file in current_uploaded_files.items()
+            if file_name not in saved_docs
+        ]
+        if new_files:
+            # Resolve the target folder on the script thread; the pool
+            # workers must not read st.session_state
+            docs_folder = os.path.join(
+                "uploaded_files", st.session_state["username"], "documents"
+            )
+            # Overlap the disk writes instead of saving one file at a time
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                list(
+                    executor.map(
+                        lambda f: save_uploaded_file(f, docs_folder),
+                        new_files,
+                    )
+                )
+            for uploaded_file in new_files:
                 # Store file info in session state
-                st.session_state["uploaded_docs"].append(uploaded_file)
+                saved_docs[uploaded_file.name] = uploaded_file
                 logging.info(f"Document {uploaded_file} has been saved to the system")
 
         # Remove files that were uploaded but no longer in the uploaded_docs
-        files_to_remove = previously_uploaded_files - current_uploaded_files
-        if files_to_remove:
-            for file_to_remove in files_to_remove:
-                remove_saved_file(file_to_remove)
-                # Update session state to reflect file removal
-                st.session_state["uploaded_docs"] = [
-                    f
-                    for f in st.session_state["uploaded_docs"]
-                    if f.name != file_to_remove
-                ]
+        for file_to_remove in saved_docs.keys() - current_uploaded_files.keys():
+            remove_saved_file(file_to_remove)
+            # Drop the entry instead of rebuilding the whole collection
+            del saved_docs[file_to_remove]
 
         st.success(
             f"✅ All {len(uploaded_docs)} file(s) have been uploaded successfully."
@@ -954,19 +1375,16 @@ with tab1:
             "docx": "📃 DOCX Files",
             "txt": "📝 TXT Files",
         }
-        files_by_type = {}
-        for file_type in file_types:
-            files_by_type[file_type] = [
-                f
-                for f in st.session_state["uploaded_docs"]
-                if f.name.endswith(file_type)
-            ]
-
-        for file_type, files in files_by_type.items():
-            st.markdown(f"### {file_types[file_type]}")
-            if files:
-                for file in files:
-                    st.write(f"- {file.name}")
+        # Group the names by extension in one pass instead of one scan per type
+        files_by_type: dict[str, list[str]] = defaultdict(list)
+        for name in st.session_state["uploaded_docs"]:
+            files_by_type[name.rsplit(".", 1)[-1].lower()].append(name)
+
+        for file_type, type_label in file_types.items():
+            st.markdown(f"### {type_label}")
+            if files_by_type[file_type]:
+                for file_name in files_by_type[file_type]:
+                    st.write(f"- {file_name}")
             else:
                 st.write("No files uploaded.")
     else:
@@ -993,18 +1411,7 @@ with tab2:
 
     # Provide a mockup example to the user for requirements
     st.header("Mockup Example for Requirements")
-    mockup_data = {
-        "Requirement Title": [
-            "Legal responsibility",
-            "Certification Agreement",
-            "Management of Impartiality",
-        ],
-        "Requirement": ["Req 1", "Req 2", "Req 3"],
-        "Requirement ID": ["5.1.1", "5.1.2", "5.1.3"],
-        "Potential Means of Compliance": ["MoC 1", "MoC 2", "MoC 3"],
-    }
-    mockup_df = pd.DataFrame(mockup_data)
-    st.dataframe(mockup_df.style.set_properties(**{"text-align": "left"}))
+    st.markdown(_mockup_html(), unsafe_allow_html=True)
 
     st.warning(
         "❗ If these columns are not available, the file upload will be rejected."
@@ -1022,18 +1429,20 @@ with tab2:
     if "requirements_df" not in st.session_state:
         st.session_state["requirements_df"] = None
         st.session_state["requirements_file_name"] = None
+        st.session_state["requirements_file_id"] = None
     else:
         # If no file is uploaded or the file is removed
         if not uploaded_requirements:
             st.session_state["requirements_df"] = None
             st.session_state["requirements_file_name"] = None
+            st.session_state["requirements_file_id"] = None
 
     requirements_valid = False  # Flag to check if requirements are valid
 
     if uploaded_requirements is not None:
         try:
-            # Load the data
-            requirements_df = pd.read_excel(uploaded_requirements)
+            # Load the data; cached per upload across reruns
+            requirements_df = _load_requirements(uploaded_requirements)
 
             # Check if all required columns are in the uploaded file
             if all(col in requirements_df.columns for col in required_columns):
@@ -1041,15 +1450,21 @@ with tab2:
                 # st.dataframe(requirements_df)
                 st.success("✅ Requirements format is correct.")
                 requirements_valid = True  # Set flag to True
-                # Save the uploaded file
-                save_requirements_file(uploaded_requirements)
-                if st.session_state["requirements_file_name"] is None:
+                # Save the uploaded file only when it is new for the
+                # session; file_id changes on every upload, so a
+                # corrected file with the same name is saved again
+                if (
+                    st.session_state.get("requirements_file_id")
+                    != uploaded_requirements.file_id
+                ):
+                    save_requirements_file(uploaded_requirements)
                     logging.info(
                     f"Requirement file {uploaded_requirements.name} has been saved to the system" # noqa: E501
                 )
                 # Store requirements in session state
                 st.session_state["requirements_df"] = requirements_df
                 st.session_state["requirements_file_name"] = uploaded_requirements.name
+                st.session_state["requirements_file_id"] = uploaded_requirements.file_id
 
             else:
                 missing_columns = [
@@ -1124,8 +1539,8 @@ with tab3:
                 st.markdown("", unsafe_allow_html=True)
                 st.markdown("", unsafe_allow_html=True)
                 with st.container(height=400):
-                    for doc in st.session_state["uploaded_docs"]:
-                        st.markdown(f"- {doc.name}", unsafe_allow_html=True)
+                    for doc_name in st.session_state["uploaded_docs"]:
+                        st.markdown(f"- {doc_name}", unsafe_allow_html=True)
             else:
                 st.write("No documents uploaded.")
 
@@ -1162,256 +1577,159 @@ with tab3:
                     st.success(
                         f"Processing started for: {st.session_state['username']}, Time: {start_time}"  # noqa: E501
                     )
-                    time.sleep(2)  # Shorter sleep for better responsiveness
                     logging.info(
                         f"Processing started for: {st.session_state['username']}"
                     )
 
-                    # Validate username input to prevent directory traversal
-                    username_safe = sanitize_filename(st.session_state["username"])
+                    # Validate username input to prevent directory traversal;
+                    # the username was sanitized once at login
+                    username_safe = st.session_state.setdefault(
+                        "username_safe",
+                        sanitize_filename(st.session_state["username"]),
+                    )
                     requirements_safe = sanitize_filename(
                         st.session_state["requirements_file_name"]
                     )
 
                     logging.info("Filenames are sanitized properly")
-                    # Ensure safe experiment name
-                    experiment_name = f"User {username_safe} NirmatAI Testing"
-                    logging.info("Trying to create the mlflow with set experiment")
-                    mlflow.set_experiment(experiment_name)
-                    time.sleep(2)  # Shorter sleep for better responsiveness
-                    logging.info("Successfully created the mlflow experiment")
-
-                    logging.info("Trying to create the mlflow run")
-                    # Simulate processing
-                    with (
-                        st.spinner("NirmatAI Processing..."),
-                        mlflow.start_run(
-                            run_name=f"{username_safe} NirmatAI Submission {start_time}"
-                        ),
-                    ):
-                        logging.info("Successfully created the mlflow run")
-                        experiment_start_time = time.time()
-                        # Initialize the NirmataDemo instance
-                        demo = NirmatAI(
-                            # system_prompt = syspr,
-                            # prompt = uspr,
-                            base_url=BASE_URL,
-                            timeout=60 * 12,
-                            verbose=3,
+
+                    # Snapshot the session values the worker needs; the
+                    # worker thread must not touch st.session_state itself
+                    doc_names = list(st.session_state["uploaded_docs"])
+                    requirements_name = st.session_state["requirements_file_name"]
+                    # Count rows on the frame parsed in tab2 instead of
+                    # re-reading the Excel from disk just for the count
+                    reqs_number = len(st.session_state["requirements_df"])
+                    # Resolve the per-user folder layout on the script thread
+                    paths = user_paths(username_safe, requirements_safe)
+                    progress_queue: queue.Queue[str] = queue.Queue()
+
+                    # Run the pipeline off the script thread so the UI
+                    # stays responsive while the progress is streamed
+                    with ThreadPoolExecutor(max_workers=1) as executor:
+                        future = executor.submit(
+                            _run_processing_pipeline,
+                            BASE_URL,
+                            username_safe,
+                            paths,
+                            start_time,
+                            doc_names,
+                            requirements_name,
+                            reqs_number,
+                            progress_queue,
                         )
-                        logging.debug("Successfully created the NirmatAI instance")
-                        # Health Check of NirmatAI instance
-                        # If status is ko, it means not working
-                        if demo.health_check() == HealthResponse(status="ko"):
-                            st.warning(
-                                "\n\n".join(
-                                    [
-                                        "❗ Connection Error to NirmatAI: Status Code ==> Not OK",  # noqa: E501
-                                        "Please try again later ...",
-                                    ]
-                                )
+                        with st.status(
+                            "NirmatAI Processing...", expanded=True
+                        ) as status:
+                            while not future.done():
+                                try:
+                                    status.write(
+                                        progress_queue.get(timeout=0.5)
+                                    )
+                                except queue.Empty:
+                                    continue
+                            # Drain messages posted right before completion
+                            while not progress_queue.empty():
+                                status.write(progress_queue.get_nowait())
+                        outcome = future.result()
+
+                    if outcome["status"] == "connection_error":
+                        st.warning(
+                            "\n\n".join(
+                                [
+                                    "❗ Connection Error to NirmatAI: Status Code ==> Not OK",  # noqa: E501
+                                    "Please try again later ...",
+                                ]
                             )
-                            logging.error("Connection problem with NirmatAI")
-                            time.sleep(15)
-                        # If status is NOT ko, it means it is working
+                        )
+                    else:
+                        # One timestamp for the whole render phase keeps the
+                        # messages consistent and avoids repeated strftime
+                        finish_time = strftime("%c")
+                        if "ingest_error" in outcome:
+                            st.error(
+                                f"❗ Error occurred while ingesting the documents: {outcome['ingest_error']}"  # noqa: E501
+                            )
+                        elif outcome["broken_files"]:
+                            print_broken_files(outcome["broken_files"])
                         else:
-                            st.info(
-                                f"Connection to NirmatAI is successful. Time: {strftime('%c')}"  # noqa: E501
+                            st.success(
+                                f"✅ Uploaded documents are ingested. Time: {finish_time}"  # noqa: E501
                             )
-                            logging.info("Connection to NirmatAI is successful.")
 
-                            # Ensure file path safety by sanitizing paths
-                            document_dir = (
-                                os.path.join(
-                                    "uploaded_files", username_safe, "documents"
-                                )
-                                + os.path.sep
+                        reqs_number = outcome["reqs_number"]
+                        st.success(
+                            "\n\n".join(
+                                [
+                                    "🎉 Your requirement processing has started successfully!",  # noqa: E501
+                                    f"Number of Requirements: {reqs_number}",
+                                    f"Time: {finish_time}"
+                                ]
                             )
-                            requirements_path = os.path.join(
-                                "uploaded_files",
-                                username_safe,
-                                "requirements",
-                                requirements_safe,
+                        )
+                        if outcome["lock_extended"]:
+                            logging.info(
+                                f"Lock time has been updated to {reqs_number * 5} minutes" # noqa: E501
                             )
-                            time.sleep(5)
-                            try:
-                                # Ingest files safely
-                                demo.ingest(directory=document_dir)
-                                problematic_files = demo.get_broken_files()
-                                if not problematic_files:
-                                    st.success(
-                                        f"✅ Uploaded documents are ingested. Time: {strftime('%c')}"  # noqa: E501
-                                    )
-                                else:
-                                    print_broken_files(problematic_files)
-                                    st.success(
-                                        f"✅ Other uploaded documents are ingested. Time: {strftime('%c')}"  # noqa: E501
-                                    )
-
-                                logging.info("Uploaded documents are ingested.")
-                            except Exception as e:
-                                st.error(
-                                    f"❗ Error occurred while ingesting the documents: {e!s}"  # noqa: E501
-                                )
-                                logging.error(
-                                    f"Error occurred while ingesting the documents: {e!s}" # noqa: E501
-                                )
 
-                            # Load requirements and get the results
-                            time.sleep(40)
-                            demo.load_requirements(reqs_file=requirements_path)
-                            mlflow.log_artifact(local_path=requirements_path)
-
-                            # Print number of requirements
-                            reqs_number = total_number_of_reqs(requirements_path)
+                        if "process_error" in outcome:
+                            st.error(
+                                f"❗ Error occurred while processing the requirements: {outcome['process_error']}"  # noqa: E501
+                            )
+                        else:
+                            result = outcome["result"]
+                            st.header(
+                                "NirmatAI Results for the Processed Requirements"
+                            )
+                            st.dataframe(result)
                             st.success(
-                                "\n\n".join(
-                                    [
-                                        "🎉 Your requirement processing has started successfully!",  # noqa: E501
-                                        f"Number of Requirements: {reqs_number}",
-                                        f"Time: {strftime('%c')}"
-                                    ]
-                                )
+                                f"🎉 Processing Requirements result saved successfully! Time: {finish_time}"  # noqa: E501
                             )
-                            logging.info(
-                                "Your requirement has been uploaded successfully."
+                            st.session_state["NirmatAI_file_name"] = outcome[
+                                "result_file"
+                            ]
+                            st.subheader("Results Overview")
+                            st.write(outcome["process_logs"])
+                            st.session_state["log_stats"] = outcome["log_stats"]
+                            st.session_state["NirmatAI_log_file_name"] = outcome[
+                                "result_log_file"
+                            ]
+
+                        if "delete_error" in outcome:
+                            st.error(
+                                f"An error occurred while deleting the ingested documents: {outcome['delete_error']}"  # noqa: E501
                             )
-                            # Check if lock time needs to be updated
-                            locktime_update = update_lock_duration(reqs_number * 5)
-                            if locktime_update:
-                                logging.info(
-                                    f"Lock time has been updated to {reqs_number * 5} minutes" # noqa: E501
-                                )
-
-                            try:
-                                # Process the requirements
-                                logging.info(
-                                    "Trying to start requirement processing ..."
-                                )
-                                result = demo.process_requirements()
-                                logging.info(
-                                    "Finished requirement processing ..."
-                                )
-                                st.header(
-                                    "NirmatAI Results for the Processed Requirements"
-                                )
-                                st.dataframe(
-                                    result.style.set_properties(
-                                        **{"text-align": "left"}
-                                    )
-                                )
-
-                                # Log the results of the labels
-                                c_stats = calculate_compliance_statistics(result)
-                                metrics = {
-                                    "Total Requirements": c_stats[0],
-                                    "Full Compliance": c_stats[1],
-                                    "Major Non-Conformity": c_stats[2],
-                                    "Minor Non-Conformity": c_stats[3],
-                                    "Unassigned Compliance": c_stats[4]
-                                }
-
-                                for label, value in metrics.items():
-                                    mlflow.log_metric(label, value)
-                                    logging.info(f"{label}: {value}")
-
-                                # Save results securely
-                                saving_time = time.strftime("%Y-%m-%d-%H:%M:%S")
-                                result_file = f"NirmatAI_results_{saving_time}.csv"
-                                result_path = os.path.join(
-                                    "uploaded_files",
-                                    username_safe,
-                                    "results",
-                                    result_file,
-                                )
-
-                                demo.save_results(result, result_path, attach_reqs=True)
-                                logging.info(
-                                    "Processing Requirements result saved successfully!"
-                                )
-                                st.success(
-                                    f"🎉 Processing Requirements result saved successfully! Time: {strftime('%c')}"  # noqa: E501
-                                )
-                                st.session_state["NirmatAI_file_name"] = result_file
-
-                                # Saving results as a log
-                                result_log_file = f"Result_logs_{saving_time}.txt"
-                                result_log_path = os.path.join(
-                                    "uploaded_files",
-                                    username_safe,
-                                    "results",
-                                    result_log_file,
-                                )
-                                result_logs = demo.get_process_logs()
-                                st.subheader("Results Overview")
-                                st.write(result_logs)
-                                generate_log_file(result_logs, str(result_log_path))
-                                st.session_state["NirmatAI_log_file_name"] = result_log_file # noqa: E501
-
-                                mlflow.log_artifact(local_path=result_path)
-                                logging.info(
-                                    "Dataframe logged as an artifact in MLflow."
-                                )
-                                mlflow.log_artifact(local_path=result_log_path)
-                                logging.info(
-                                    "Result Logs logged as an artifact in MLflow."
-                                )
-                            except Exception as e:
-                                st.error(
-                                    f"❗ Error occurred while processing the requirements: {e!s}"  # noqa: E501
-                                )
-                                logging.error(
-                                    "Error occurred while processing the requirements!"
-                                )
-                                time.sleep(10)
-
-                            # Delete all ingested documents after use
-                            try:
-                                demo.delete_all_documents()
-                                logging.info("Ingested documents deleted successfully.")
-                                st.info("Ingested documents deleted successfully.")
-                            except Exception as e:
-                                logging.error(
-                                    f"An error occurred while deleting the ingested documents: {e!s}"  # noqa: E501
-                                )
-                                st.error(
-                                    f"An error occurred while deleting the ingested documents: {e!s}"  # noqa: E501
-                                )
-
-                            # Calculate and display the execution time
-                            end_time = time.time()
-                            elapsed_time = round(end_time - experiment_start_time, 2)
-                            hours, remainder = divmod(elapsed_time, 3600)
-                            minutes, seconds = divmod(remainder, 60)
-
-                            # Format total execution time in a verbal format
-                            formatted_time = f"{int(hours)} hours, {int(minutes)} minutes, {int(seconds)} seconds" if hours > 0 else f"{int(minutes)} minutes, {int(seconds)} seconds" # noqa: E501
+                        else:
+                            st.info("Ingested documents deleted successfully.")
 
-                            if st.session_state["Total_exec_time"] is None:
-                                # Store the total execution time in session state
-                                st.session_state["Total_exec_time"] = formatted_time
+                        # Calculate and display the execution time
+                        elapsed_time = outcome["elapsed_time"]
+                        hours, remainder = divmod(elapsed_time, 3600)
+                        minutes, seconds = divmod(remainder, 60)
 
-                            # Calculate average time per requirement
-                            if reqs_number > 0:
-                                average_time_per_requirement = elapsed_time / reqs_number # noqa: E501
-                                avg_minutes, avg_seconds = divmod(average_time_per_requirement, 60) # noqa: E501
-                                formatted_avg_time = f"{int(avg_minutes)} minutes, {int(avg_seconds)} seconds" if avg_minutes > 0 else f"{int(avg_seconds)} seconds" # noqa: E501
-                            else:
-                                formatted_avg_time = "No requirements"
-
-                            # Store the average time per requirement in session state
-                            if st.session_state["Avg_exec_time_per_req"] is None:
-                                st.session_state[
-                                    "Avg_exec_time_per_req"
-                                ] = formatted_avg_time
-                            st.info(
-                                f"Execution time: {int(hours)} hours, {int(minutes)} minutes, and {seconds:.2f} seconds"  # noqa: E501
-                            )
+                        # Format total execution time in a verbal format
+                        formatted_time = f"{int(hours)} hours, {int(minutes)} minutes, {int(seconds)} seconds" if hours > 0 else f"{int(minutes)} minutes, {int(seconds)} seconds" # noqa: E501
 
-                            # Log execution time to MLflow
-                            mlflow.log_param("Execution Time", elapsed_time)
+                        if st.session_state["Total_exec_time"] is None:
+                            # Store the total execution time in session state
+                            st.session_state["Total_exec_time"] = formatted_time
 
-                            time.sleep(2)
+                        # Calculate average time per requirement
+                        if reqs_number > 0:
+                            average_time_per_requirement = elapsed_time / reqs_number
+                            avg_minutes, avg_seconds = divmod(average_time_per_requirement, 60) # noqa: E501
+                            formatted_avg_time = f"{int(avg_minutes)} minutes, {int(avg_seconds)} seconds" if avg_minutes > 0 else f"{int(avg_seconds)} seconds" # noqa: E501
+                        else:
+                            formatted_avg_time = "No requirements"
+
+                        # Store the average time per requirement in session state
+                        if st.session_state["Avg_exec_time_per_req"] is None:
+                            st.session_state[
+                                "Avg_exec_time_per_req"
+                            ] = formatted_avg_time
+                        st.info(
+                            f"Execution time: {int(hours)} hours, {int(minutes)} minutes, and {seconds:.2f} seconds"  # noqa: E501
+                        )
                     logging.info("Processing complete!")
                     st.success("Processing complete!")
                 except Exception as e:
@@ -1421,62 +1739,81 @@ with tab3:
                     release_lock()
                     st.rerun()
             else:
-                try:
-                    # Try to get lock information (who holds it, when it was acquired)
-                    lock_username, lock_time = get_lock_info()
-
-                    # Check if the lock username is empty in the session state
-                    if not st.session_state.get("current_lockusername") or st.session_state["current_lockusername"] != lock_username: # noqa: E501
-                        st.session_state["current_lockusername"] = lock_username
-                        st.rerun()
-                    else:
-                        if lock_time is not None:
-                            current_time = time.time()
-
-                            # Ensure the lock time is valid and not in the future
-                            if lock_time <= current_time:
-                                elapsed_time = current_time - lock_time
-                                remaining_time = get_remaining_lock_time()
-
-                                if remaining_time is not None and remaining_time > 0:
-                                    # Calculate remaining time
-                                    minutes, seconds = divmod(int(remaining_time), 60)
-                                    if minutes > 0:
-                                        time_message = (
-                                            f"{minutes} minutes and {seconds} seconds"
+                if st.session_state.get("_lock_fd") is not None:
+                    # This session already holds the lock (ownership is
+                    # proven by the live flock fd), so skip the contention
+                    # UI and the lockfile parsing it would trigger
+                    st.info(
+                        "Processing is already running in this session. "
+                        "Please wait for it to finish."
+                    )
+                else:
+                    try:
+                        # Get lock info (who holds it and when it was acquired)
+                        lock_username, lock_time = get_lock_info()
+
+                        # Check if the lock username is empty in the session state
+                        if not st.session_state.get("current_lockusername") or st.session_state["current_lockusername"] != lock_username: # noqa: E501
+                            st.session_state["current_lockusername"] = lock_username
+                            # Back off before refreshing instead of rerunning
+                            # immediately while another user holds the lock
+                            time.sleep(next_poll_interval(get_remaining_lock_time()))
+                            st.rerun()
+                        else:
+                            if lock_time is not None:
+                                current_time = time.time()
+
+                                # Ensure the lock time is valid and not in the future
+                                if lock_time <= current_time:
+                                    elapsed_time = current_time - lock_time
+                                    remaining_time = get_remaining_lock_time()
+
+                                    if remaining_time is not None and remaining_time > 0: # noqa: E501
+                                        # Reformat the remaining time only
+                                        # when the whole-seconds tick moves;
+                                        # reruns in between reuse the cached
+                                        # message so the warning diff is a
+                                        # no-op
+                                        wait_secs = int(remaining_time)
+                                        if st.session_state.get("_last_wait_secs") != wait_secs: # noqa: E501
+                                            minutes, seconds = divmod(wait_secs, 60)
+                                            st.session_state["_last_wait_msg"] = (
+                                                f"{minutes} minutes and {seconds} seconds" # noqa: E501
+                                                if minutes > 0
+                                                else f"{seconds} seconds"
+                                            )
+                                            st.session_state["_last_wait_secs"] = wait_secs # noqa: E501
+
+                                        # Display a warning message with remaining time
+                                        st.warning(
+                                            f"The system is currently being used by {lock_username}. "  # noqa: E501
+                                            f"Please try again in {st.session_state['_last_wait_msg']}."  # noqa: E501
                                         )
                                     else:
-                                        time_message = f"{seconds} seconds"
-
-                                    # Display a warning message with remaining time
-                                    st.warning(
-                                        f"The system is currently being used by {lock_username}. "  # noqa: E501
-                                        f"Please try again in {time_message}."
-                                    )
+                                        # Lock expired; unlock automatically
+                                        st.warning(
+                                            f"The system was recently locked by {lock_username}, but the lock has expired. "  # noqa: E501
+                                            f"Please try again shortly."
+                                        )
+                                        # Release the lock
+                                        release_lock()
+                                        st.session_state["current_lockusername"] = None
+                                        st.rerun()
                                 else:
-                                    # Lock expired, system to be unlocked automatically
-                                    st.warning(
-                                        f"The system was recently locked by {lock_username}, but the lock has expired. "  # noqa: E501
-                                        f"Please try again shortly."
+                                    # In case lock_time is somehow in the future
+                                    st.error(
+                                        "An error occurred: lock acquisition time is invalid. Please contact support."  # noqa: E501
                                     )
-                                    # Release the lock
-                                    release_lock()
-                                    time.sleep(2)
-                                    st.session_state["current_lockusername"] = None
-                                    st.rerun()
                             else:
-                                # In case lock_time is somehow in the future
-                                st.error(
-                                    "An error occurred: lock acquisition time is invalid. Please contact support."  # noqa: E501
+                                # lock_time is None (handle gracefully)
+                                st.warning(
+                                    f"The system is currently being used by {lock_username}. "  # noqa: E501
                                 )
-                        else:
-                            # lock_time is None (handle gracefully)
-                            st.warning(
-                                f"The system is currently being used by {lock_username}. "  # noqa: E501
-                            )
-                except Exception:
-                    st.error(
-                        "An unexpected error occurred while trying to check the lock status. Please try again later."  # noqa: E501
-                    )
-                    time.sleep(2)
-                    st.rerun()
+                    except Exception:
+                        st.error(
+                            "An unexpected error occurred while trying to check the lock status. Please try again later."  # noqa: E501
+                        )
+                        # Brief pause so the message flashes and a persistent
+                        # failure does not rerun in a tight loop
+                        time.sleep(0.25)
+                        st.rerun()
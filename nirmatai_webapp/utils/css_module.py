@@ -1,15 +1,26 @@
 """CSS module of NirmatAI WebApp."""
 
+import functools
+
 import streamlit as st
 
 
+@functools.cache
+def _css_html(css_text: str) -> str:
+    """Wrap the CSS in a style tag once instead of on every rerun."""
+    return f"<style>{css_text}</style>"
+
+
 def local_css(css_text: str) -> None:
     """Injects local CSS into a Streamlit app.
 
+    The wrapped HTML is memoized, so reruns re-emit the identical string
+    and Streamlit's element diff sends nothing to the browser.
+
     Parameters:
     css_text (str): The CSS code as a string to be injected into the app.
     """
-    st.markdown(f"<style>{css_text}</style>", unsafe_allow_html=True)
+    st.markdown(_css_html(css_text), unsafe_allow_html=True)
 
 custom_css = """
 /* Smooth animated wave background in lilac tones for main container */
@@ -58,6 +69,11 @@ div.stDataFrame {
     margin-bottom: 20px;
 }
 
+/* Left-align DataFrame cells once, instead of a per-cell pandas Styler */
+div[data-testid="stDataFrame"] td {
+    text-align: left;
+}
+
 /* Heading styles with modern font and no shadow */
 h1, h2, h3 {
     font-family: 'Roboto', sans-serif;
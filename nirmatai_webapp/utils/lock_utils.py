@@ -1,7 +1,9 @@
 """Locking mechanism module of NirmatAI WebApp."""
+import fcntl
 import logging
 import os
-import shutil
+import struct
+import threading
 import time
 import uuid
 
@@ -14,6 +16,88 @@ logging.basicConfig(level=logging.INFO)
 LOCK_FILE = "nirmatai_webapp.lock"
 MAX_LOCK_DURATION = 1800  # 30 minutes
 
+# Fixed-width binary lock record: null-padded username, uuid4 token,
+# lock time and duration. One read and one unpack recover the record,
+# and any size mismatch marks the file as corrupted.
+_LOCK_STRUCT = struct.Struct("<64s36sdd")
+# Capacity of the username field above; struct would silently truncate
+# longer names, so acquire_lock rejects them before creating the file
+_USERNAME_MAX_BYTES = 64
+
+# Parsed lock record cached against the file's stat signature and a short
+# TTL, so concurrent readers within one tick share a single stat/read.
+# The cache tuple is (validated_at_monotonic, stat_key, record).
+_CACHE_TTL = 0.2
+_cache_lock = threading.Lock()
+_lock_cache: tuple[float, tuple[int, int] | None, tuple[str, str, float, float] | None] = (0.0, None, None) # noqa: E501
+
+
+def _invalidate_lock_cache() -> None:
+    """Force the next _read_lock call to hit the filesystem."""
+    global _lock_cache
+    _lock_cache = (0.0, None, None)
+
+
+def _read_lock() -> tuple[str, str, float, float] | None:
+    """Parse the lock file once per on-disk version.
+
+    A record validated less than _CACHE_TTL ago is returned without any
+    syscall; after that a single os.stat revalidates it and the content
+    is re-read only when the stat signature moves. A threading.Lock
+    makes concurrent cache refills collapse into one reader.
+
+    Returns:
+    tuple[str, str, float, float] | None: The (username, token, lock_time,
+                duration) record, or None if the lock file does not exist
+                or cannot be parsed.
+    """
+    global _lock_cache
+    # Lock-free fast path: tuple reads are atomic in CPython
+    cached = _lock_cache
+    if time.monotonic() - cached[0] < _CACHE_TTL:
+        return cached[2]
+    with _cache_lock:
+        cached = _lock_cache
+        if time.monotonic() - cached[0] < _CACHE_TTL:
+            return cached[2]
+        try:
+            stat = os.stat(LOCK_FILE)
+        except FileNotFoundError:
+            _lock_cache = (time.monotonic(), None, None)
+            return None
+        key = (stat.st_mtime_ns, stat.st_ino)
+        if cached[1] == key:
+            _lock_cache = (time.monotonic(), key, cached[2])
+            return cached[2]
+        try:
+            with open(LOCK_FILE, "rb") as f:
+                data = f.read(_LOCK_STRUCT.size)
+            if len(data) != _LOCK_STRUCT.size:
+                return None
+            username, token, lock_time, duration = _LOCK_STRUCT.unpack(data)
+            record = (
+                username.rstrip(b"\x00").decode(),
+                token.rstrip(b"\x00").decode(),
+                lock_time,
+                duration,
+            )
+        except (OSError, ValueError, UnicodeDecodeError) as e:
+            logging.error(f"Error reading lock file: {e}")
+            return None
+        _lock_cache = (time.monotonic(), key, record)
+        return record
+
+
+def _drop_held_fd() -> None:
+    """Unlock and close the flock fd held by this session, if any."""
+    fd = st.session_state.pop("_lock_fd", None)
+    if fd is not None:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+        except OSError as e:
+            logging.error(f"Error closing held lock fd: {e}")
+
 
 def acquire_lock() -> bool:
     """Attempt to acquire the lock atomically and store a unique token.
@@ -29,16 +113,37 @@ def acquire_lock() -> bool:
         if "username" not in st.session_state:
             raise ValueError("Session state 'username' is not initialized.")
 
+        # Fail fast before the file is created: a truncated name would
+        # never match the session username again, wedging release_lock
+        username_bytes = st.session_state["username"].encode()
+        if len(username_bytes) > _USERNAME_MAX_BYTES:
+            raise ValueError(
+                f"Username exceeds {_USERNAME_MAX_BYTES} bytes and does not "
+                "fit the lock record."
+            )
+
         # Atomically create the lock file
         fd = os.open(LOCK_FILE, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
-        with os.fdopen(fd, "w") as f:
-            f.write(f"{st.session_state['username']}\n")
-            f.write(f"{lock_token}\n")
-            f.write(str(time.time()) + "\n")
-            f.write(str(MAX_LOCK_DURATION))
-
-        # Store the lock token in session state
+        try:
+            # Hold an advisory flock on the open fd for the lifetime of
+            # the lock, so ownership is proven by the kernel rather than
+            # only by the token comparison
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            os.write(fd, _LOCK_STRUCT.pack(
+                username_bytes,
+                lock_token.encode(),
+                time.time(),
+                float(MAX_LOCK_DURATION),
+            ))
+        except Exception:
+            os.close(fd)
+            raise
+
+        _invalidate_lock_cache()
+
+        # Store the lock token and the held fd in session state
         st.session_state["lock_token"] = lock_token
+        st.session_state["_lock_fd"] = fd
         logging.info("Lock acquired successfully.")
         return True
     except FileExistsError:
@@ -56,19 +161,17 @@ def is_locked() -> bool:
     bool: True if lock file exists and is valid, False if lock is stale or not present.
     """
     try:
-        if os.path.exists(LOCK_FILE):
-            with open(LOCK_FILE) as f:
-                lines = f.readlines()
-                if len(lines) >= 4:
-                    lock_time = float(lines[2].strip())
-                    lock_duration = float(lines[3].strip())  # Read lock duration
-                    if time.time() - lock_time > lock_duration:
-                        # Lock is stale; remove it
-                        os.remove(LOCK_FILE)
-                        logging.info("Stale lock file removed.")
-                        return False
-                    return True
-        return False
+        record = _read_lock()
+        if record is None:
+            return False
+        _, _, lock_time, lock_duration = record
+        if time.time() - lock_time > lock_duration:
+            # Lock is stale; remove it
+            os.remove(LOCK_FILE)
+            _invalidate_lock_cache()
+            logging.info("Stale lock file removed.")
+            return False
+        return True
     except Exception as e:
         logging.error(f"Error checking lock status: {e}")
         return False
@@ -81,40 +184,52 @@ def release_lock(time_flag: bool = False) -> None:
     time_flag (bool): If True, the lock will be released even if tokens do not match.
     """
     try:
-        if os.path.exists(LOCK_FILE):
-            with open(LOCK_FILE) as f:
-                lines = f.readlines()
-                if len(lines) >= 3:
-                    lock_username = lines[0].strip()
-                    lock_token = lines[1].strip()
-
-                    # Check if session state has 'username' and 'lock_token'
-                    if "username" not in st.session_state or "lock_token" not in st.session_state: # noqa: E501
-                        raise ValueError(
-                            "Session 'username' or 'lock_token' is not initialized."
-                        )
-
-                    # Compare tokens
-                    if lock_username == st.session_state["username"] and lock_token == st.session_state.get("lock_token", ""): # noqa: E501
-                        os.remove(LOCK_FILE)
-                        del st.session_state["lock_token"]
-                        logging.info("Lock released successfully.")
-                    elif time_flag:
-                        # Token expired; release the lock
-                        os.remove(LOCK_FILE)
-                        del st.session_state["lock_token"]
-                        logging.info("Lock released due to expiration.")
-                    else:
-                        st.error("You do not have permission to release this lock.")
-                        logging.warning(
-                            "Attempted to release lock without matching token."
-                        )
-                else:
-                    # Lock file is corrupted or invalid
-                    os.remove(LOCK_FILE)
-                    logging.warning("Corrupted lock file removed.")
+        record = _read_lock()
+        if record is not None:
+            lock_username, lock_token, _, _ = record
+
+            # Check if session state has 'username' and 'lock_token'
+            if "username" not in st.session_state or "lock_token" not in st.session_state: # noqa: E501
+                raise ValueError(
+                    "Session 'username' or 'lock_token' is not initialized."
+                )
+
+            # Compare tokens
+            if lock_username == st.session_state["username"] and lock_token == st.session_state.get("lock_token", ""): # noqa: E501
+                os.remove(LOCK_FILE)
+                _invalidate_lock_cache()
+                _drop_held_fd()
+                del st.session_state["lock_token"]
+                logging.info("Lock released successfully.")
+            elif time_flag:
+                # Token expired; release the lock
+                os.remove(LOCK_FILE)
+                _invalidate_lock_cache()
+                _drop_held_fd()
+                del st.session_state["lock_token"]
+                logging.info("Lock released due to expiration.")
+            else:
+                # The file belongs to someone else, so whatever this
+                # session still holds (fd, token) is stale — drop it, or
+                # the owner gate would keep treating the session as owner
+                _drop_held_fd()
+                st.session_state.pop("lock_token", None)
+                st.error("You do not have permission to release this lock.")
+                logging.warning(
+                    "Attempted to release lock without matching token."
+                )
+        elif os.path.exists(LOCK_FILE):
+            # Lock file is corrupted or invalid
+            os.remove(LOCK_FILE)
+            _invalidate_lock_cache()
+            _drop_held_fd()
+            st.session_state.pop("lock_token", None)
+            logging.warning("Corrupted lock file removed.")
         else:
-            st.warning("Lock file does not exist.")
+            # No file on disk: any held fd or token is left over from a
+            # lock that another session already removed
+            _drop_held_fd()
+            st.session_state.pop("lock_token", None)
             logging.info("Lock file does not exist when attempting to release.")
     except Exception as e:
         logging.error(f"Error releasing lock: {e}")
@@ -134,17 +249,27 @@ def update_lock_duration(new_duration: int) -> bool:
         MAX_LOCK_DURATION = new_duration
 
         try:
-            if os.path.exists(LOCK_FILE):
-                with open(LOCK_FILE) as f:
-                    lines = f.readlines()
-
-                if len(lines) >= 4:
-                    lines[3] = str(new_duration) + "\n"
-
-                    with open(LOCK_FILE, "w") as f:
-                        f.writelines(lines)
-                    logging.info("Lock file duration updated successfully.")
-                    return True
+            record = _read_lock()
+
+            if record is not None:
+                lock_username, lock_token, lock_time, _ = record
+
+                # Write to a temp file and rename atomically, so a
+                # concurrent reader never observes a truncated lock file
+                tmp_path = LOCK_FILE + ".tmp." + uuid.uuid4().hex
+                with open(tmp_path, "wb") as f:
+                    f.write(_LOCK_STRUCT.pack(
+                        lock_username.encode(),
+                        lock_token.encode(),
+                        lock_time,
+                        float(new_duration),
+                    ))
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, LOCK_FILE)
+                _invalidate_lock_cache()
+                logging.info("Lock file duration updated successfully.")
+                return True
 
             logging.info(
                 "Lock duration updated in memory. No active lock file to modify."
@@ -167,15 +292,12 @@ def get_remaining_lock_time() -> float | None:
     float | None: The remaining time before lock expires, or None if no lock exists.
     """
     try:
-        if os.path.exists(LOCK_FILE):
-            with open(LOCK_FILE) as f:
-                lines = f.readlines()
-                if len(lines) >= 4:
-                    lock_time = float(lines[2].strip())
-                    lock_duration = float(lines[3].strip())
-                    remaining_time = (lock_time + lock_duration) - time.time()
-                    return max(0, remaining_time)
-        return None
+        record = _read_lock()
+        if record is None:
+            return None
+        _, _, lock_time, lock_duration = record
+        remaining_time = (lock_time + lock_duration) - time.time()
+        return max(0, remaining_time)
     except Exception as e:
         logging.error(f"Error calculating remaining lock time: {e}")
         return None
@@ -190,19 +312,53 @@ def get_lock_info() -> tuple[str | None, float | None]:
                 or (None, None) if the lock file does not exist or is invalid.
     """
     try:
-        if os.path.exists(LOCK_FILE):
-            with open(LOCK_FILE) as f:
-                lines = f.readlines()
-                if len(lines) >= 4:
-                    lock_username = lines[0].strip()
-                    lock_time = float(lines[2].strip())
-                    return lock_username, lock_time
-        return None, None
+        record = _read_lock()
+        if record is None:
+            return None, None
+        lock_username, _, lock_time, _ = record
+        return lock_username, lock_time
     except Exception as e:
         logging.error(f"Error retrieving lock info: {e}")
         return None, None
 
 
+def next_poll_interval(remaining_time: float | None) -> float:
+    """Backoff delay before the next lock-status poll.
+
+    The delay scales with the remaining lock time and is bounded to the
+    0.25-2.0 second range, so sessions waiting on another user's lock do
+    not busy-poll the lock file with immediate reruns.
+
+    Parameters:
+    remaining_time (float | None): Remaining lock time in seconds, or None.
+
+    Returns:
+    float: Seconds to sleep before polling the lock again.
+    """
+    if remaining_time is None:
+        return 0.25
+    return min(max(remaining_time / 20, 0.25), 2.0)
+
+
+def _fast_rmtree(path: str) -> None:
+    """Recursively delete a tree using scandir's cached entry types.
+
+    DirEntry.is_dir reuses the type returned by the directory listing,
+    so each entry costs one unlink/rmdir instead of shutil.rmtree's
+    extra per-entry stat.
+
+    Parameters:
+    path (str): The directory to remove.
+    """
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                _fast_rmtree(entry.path)
+            else:
+                os.unlink(entry.path)
+    os.rmdir(path)
+
+
 def remove_user_folder(username: str) -> None:
     """Removes the folder for a specific user and all its contents.
 
@@ -215,8 +371,8 @@ def remove_user_folder(username: str) -> None:
 
         user_folder = os.path.join("uploaded_files", username)
 
-        if os.path.exists(user_folder):
-            shutil.rmtree(user_folder)
+        if os.path.lexists(user_folder):
+            _fast_rmtree(user_folder)
             logging.info(f"User folder '{username}' removed successfully.")
         else:
             logging.warning(f"User folder '{username}' does not exist.")
@@ -1,41 +1,142 @@
 """Visual description module of Web App."""
 
-import matplotlib.pyplot as plt
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+import numpy as np
+import numpy.typing as npt
 import pandas as pd
 import seaborn as sns
 import streamlit as st
-from sklearn.metrics import classification_report, confusion_matrix
+from matplotlib.figure import Figure
+
+# The compliance classes the charts know about, frozen so the tuple can
+# serve directly as an st.cache_data key and a Categorical category list
+REQUIRED_LABELS: tuple[str, ...] = (
+    "full-compliance",
+    "minor non-conformity",
+    "major non-conformity",
+)
+
+# Shared pool for chart rendering on cache misses, so concurrent
+# sessions do not serialize their matplotlib work on the script thread.
+# Safe because each draw helper works on its own Figure, never pyplot.
+_PLOT_POOL = ThreadPoolExecutor(max_workers=2)
+
+
+def _figure_to_png(fig: Figure) -> bytes:
+    """Render a figure to PNG bytes for st.image."""
+    buf = BytesIO()
+    fig.savefig(buf, format="png", dpi=100, bbox_inches="tight")
+    return buf.getvalue()
+
+
+def _hash_labels(series: pd.Series) -> bytes:
+    """Stable cache key for a label Series."""
+    return pd.util.hash_pandas_object(series, index=False).values.tobytes()
+
+
+@st.cache_data(show_spinner=False, max_entries=8, hash_funcs={pd.Series: _hash_labels})
+def _labels_and_report(
+        true_labels: pd.Series,
+        predicted_labels: pd.Series,
+        required_labels: tuple[str, ...]
+    ) -> tuple[
+        npt.NDArray[np.object_],
+        npt.NDArray[np.object_],
+        int,
+        int,
+        dict[str, dict[str, float]],
+        npt.NDArray[np.int64],
+        npt.NDArray[np.intp],
+        npt.NDArray[np.intp],
+    ]:
+    """Filter the labels and compute report, matrix and counts once.
+
+    The charts below all need the same filtered labels, classification
+    report, confusion matrix and per-class counts, so this cached helper
+    derives them all from a single categorical encoding of each Series
+    instead of rescanning the labels once per chart on every rerun.
+    """
+    num_labels = len(required_labels)
+    true_codes = pd.Categorical(true_labels, categories=required_labels).codes
+    pred_codes = pd.Categorical(predicted_labels, categories=required_labels).codes
+
+    true_mask = true_codes >= 0
+    pred_mask = pred_codes >= 0
+    num_unexpected_true = int(true_mask.size - true_mask.sum())
+    num_unexpected_pred = int(pred_mask.size - pred_mask.sum())
+
+    filtered_true_labels = true_labels.to_numpy()[true_mask]
+    filtered_pred_labels = predicted_labels.to_numpy()[pred_mask]
+
+    # Per-class counts from the codes, in required_labels order
+    true_counts = np.bincount(true_codes[true_mask], minlength=num_labels)
+    pred_counts = np.bincount(pred_codes[pred_mask], minlength=num_labels)
+
+    # Confusion matrix from the rows where both labels are expected
+    pair_mask = true_mask & pred_mask
+    cm = np.zeros((num_labels, num_labels), dtype=np.int64)
+    np.add.at(cm, (true_codes[pair_mask], pred_codes[pair_mask]), 1)
+
+    # Per-class precision/recall/F1 straight from the matrix; for three
+    # fixed labels this replaces sklearn's generic label discovery and
+    # report assembly with a handful of numpy operations
+    tp = np.diag(cm).astype(np.float64)
+    fp = cm.sum(axis=0) - tp
+    fn = cm.sum(axis=1) - tp
+    precision = tp / np.maximum(tp + fp, 1)
+    recall = tp / np.maximum(tp + fn, 1)
+    f1 = 2 * precision * recall / np.maximum(precision + recall, 1e-12)
+    report = {
+        label: {
+            "precision": float(precision[idx]),
+            "recall": float(recall[idx]),
+            "f1-score": float(f1[idx]),
+            "support": int(cm[idx].sum()),
+        }
+        for idx, label in enumerate(required_labels)
+    }
+
+    return (
+        filtered_true_labels,
+        filtered_pred_labels,
+        num_unexpected_true,
+        num_unexpected_pred,
+        report,
+        cm,
+        true_counts,
+        pred_counts,
+    )
 
 
 def filter_unexpected_labels(
         true_labels: pd.Series,
         predicted_labels: pd.Series,
         required_labels: list[str]
-    ) -> tuple[pd.Series, pd.Series, int, int]:
+    ) -> tuple[npt.NDArray[np.object_], npt.NDArray[np.object_], int, int]:
     """Filter out unexpected labels and count how many were removed."""
-    unexpected_true_labels = ~true_labels.isin(required_labels)
-    unexpected_pred_labels = ~predicted_labels.isin(required_labels)
+    # One categorical pass per Series: code -1 marks an unexpected label
+    true_codes = pd.Categorical(true_labels, categories=required_labels).codes
+    pred_codes = pd.Categorical(predicted_labels, categories=required_labels).codes
+
+    true_mask = true_codes >= 0
+    pred_mask = pred_codes >= 0
 
     # Count unexpected labels
-    num_unexpected_true = unexpected_true_labels.sum()
-    num_unexpected_pred = unexpected_pred_labels.sum()
+    num_unexpected_true = int(true_mask.size - true_mask.sum())
+    num_unexpected_pred = int(pred_mask.size - pred_mask.sum())
 
     # Filter out unexpected labels
-    filtered_true_labels = true_labels[~unexpected_true_labels]
-    filtered_pred_labels = predicted_labels[~unexpected_pred_labels]
+    filtered_true_labels = true_labels.to_numpy()[true_mask]
+    filtered_pred_labels = predicted_labels.to_numpy()[pred_mask]
 
     return filtered_true_labels, filtered_pred_labels, num_unexpected_true, num_unexpected_pred # noqa: E501
 
 def plot_confusion_matrix(true_labels: pd.Series, predicted_labels: pd.Series) -> None:
     """Generate and display a confusion matrix."""
-    required_labels = [
-        "full-compliance",
-        "minor non-conformity",
-        "major non-conformity"
-    ]
-
-    # Filter unexpected labels
-    filtered_true_labels, filtered_pred_labels, num_unexpected_true, num_unexpected_pred = filter_unexpected_labels(true_labels, predicted_labels, required_labels) # noqa: E501
+    # Filter unexpected labels and get the confusion matrix from the shared cache
+    _, _, num_unexpected_true, num_unexpected_pred, _, cm, _, _ = _labels_and_report(true_labels, predicted_labels, REQUIRED_LABELS) # noqa: E501
 
     # Display counts of unexpected labels
     if num_unexpected_true > 0 or num_unexpected_pred > 0:
@@ -43,27 +144,42 @@ def plot_confusion_matrix(true_labels: pd.Series, predicted_labels: pd.Series) -
             f"Filtered out {num_unexpected_true} unexpected true labels and {num_unexpected_pred} unexpected predicted labels." # noqa: E501
         )
 
-    # Generate confusion matrix
-    cm = confusion_matrix(
-        filtered_true_labels,
-        filtered_pred_labels,
-        labels=required_labels
-    )
-
     # Plot confusion matrix
-    plt.figure(figsize=(6, 4))
+    st.image(_render_confusion_matrix_png(cm.tobytes(), REQUIRED_LABELS))
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _render_confusion_matrix_png(
+        cm_bytes: bytes,
+        required_labels: tuple[str, ...]
+    ) -> bytes:
+    """Render the confusion matrix heatmap, cached on the matrix values."""
+    return _PLOT_POOL.submit(_draw_confusion_matrix, cm_bytes, required_labels).result()
+
+
+def _draw_confusion_matrix(
+        cm_bytes: bytes,
+        required_labels: tuple[str, ...]
+    ) -> bytes:
+    """Draw the confusion matrix heatmap on a worker thread."""
+    cm = np.frombuffer(cm_bytes, dtype=np.int64).reshape(
+        len(required_labels), len(required_labels)
+    )
+    fig = Figure(figsize=(6, 4))
+    ax = fig.subplots()
     sns.heatmap(
         cm,
         annot=True,
         fmt="d",
         cmap="Blues",
         xticklabels=required_labels,
-        yticklabels=required_labels
+        yticklabels=required_labels,
+        ax=ax
     )
-    plt.xlabel("Predicted Label")
-    plt.ylabel("True Label")
-    plt.title("Confusion Matrix")
-    st.pyplot(plt)
+    ax.set_xlabel("Predicted Label")
+    ax.set_ylabel("True Label")
+    ax.set_title("Confusion Matrix")
+    return _figure_to_png(fig)
 
 def plot_compliance_distribution(df: pd.DataFrame) -> None:
     """Plot the distribution of true and predicted compliance labels."""
@@ -73,17 +189,11 @@ def plot_compliance_distribution(df: pd.DataFrame) -> None:
         )
         return
 
-    required_labels = [
-        "full-compliance",
-        "minor non-conformity",
-        "major non-conformity"
-    ]
-
     true_labels = df["Label"]
     predicted_labels = df["Compliance status"]
 
-    # Filter unexpected labels
-    filtered_true_labels, filtered_pred_labels, num_unexpected_true, num_unexpected_pred = filter_unexpected_labels(true_labels, predicted_labels, required_labels) # noqa: E501
+    # Filter unexpected labels and get per-class counts from the shared cache
+    _, _, num_unexpected_true, num_unexpected_pred, _, _, true_counts, pred_counts = _labels_and_report(true_labels, predicted_labels, REQUIRED_LABELS) # noqa: E501
 
     # Display counts of unexpected labels
     if num_unexpected_true > 0 or num_unexpected_pred > 0:
@@ -91,37 +201,45 @@ def plot_compliance_distribution(df: pd.DataFrame) -> None:
             f"Filtered out {num_unexpected_true} unexpected true labels and {num_unexpected_pred} unexpected predicted labels." # noqa: E501
         )
 
-    fig, ax = plt.subplots(1, 2, figsize=(12, 5))
-
-    # True label distribution
-    true_label_counts = filtered_true_labels.value_counts()
-    ax[0].bar(true_label_counts.index, true_label_counts.values, color="skyblue")
-    ax[0].set_title("True Label Distribution")
-    ax[0].set_xlabel("Compliance Status")
-    ax[0].set_ylabel("Count")
-
-    # Predicted label distribution
-    pred_label_counts = filtered_pred_labels.value_counts()
-    ax[1].bar(pred_label_counts.index, pred_label_counts.values, color="lightgreen")
-    ax[1].set_title("Predicted Label Distribution")
-    ax[1].set_xlabel("Compliance Status")
-    ax[1].set_ylabel("Count")
-
-    st.pyplot(fig)
+    st.image(_render_distribution_png(
+        tuple(zip(REQUIRED_LABELS, true_counts.tolist(), strict=True)),
+        tuple(zip(REQUIRED_LABELS, pred_counts.tolist(), strict=True)),
+    ))
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _render_distribution_png(
+        true_counts: tuple[tuple[str, int], ...],
+        pred_counts: tuple[tuple[str, int], ...]
+    ) -> bytes:
+    """Render the label distribution bars, cached on the counts."""
+    return _PLOT_POOL.submit(_draw_distribution, true_counts, pred_counts).result()
+
+
+def _draw_distribution(
+        true_counts: tuple[tuple[str, int], ...],
+        pred_counts: tuple[tuple[str, int], ...]
+    ) -> bytes:
+    """Draw the label distribution bars on a worker thread."""
+    # One grouped bar chart instead of two axes, sharing scale and labels
+    counts = pd.DataFrame(
+        {"True": dict(true_counts), "Predicted": dict(pred_counts)}
+    )
+    fig = Figure(figsize=(12, 5))
+    ax = fig.subplots()
+    counts.plot.bar(ax=ax, color=["skyblue", "lightgreen"], rot=0)
+    ax.set_title("Label Distribution")
+    ax.set_xlabel("Compliance Status")
+    ax.set_ylabel("Count")
+    return _figure_to_png(fig)
 
 def display_classification_report(
         true_labels: pd.Series,
         predicted_labels: pd.Series
     ) -> None:
     """Extract precision and display them by class."""
-    required_labels = [
-        "full-compliance",
-        "minor non-conformity",
-        "major non-conformity"
-    ]
-
-    # Filter unexpected labels
-    filtered_true_labels, filtered_pred_labels, num_unexpected_true, num_unexpected_pred = filter_unexpected_labels(true_labels, predicted_labels, required_labels) # noqa: E501
+    # Filter unexpected labels and get the report from the shared cache
+    _, _, num_unexpected_true, num_unexpected_pred, report, _, _, _ = _labels_and_report(true_labels, predicted_labels, REQUIRED_LABELS) # noqa: E501
 
     # Display counts of unexpected labels
     if num_unexpected_true > 0 or num_unexpected_pred > 0:
@@ -129,14 +247,6 @@ def display_classification_report(
             f"Filtered out {num_unexpected_true} unexpected true labels and {num_unexpected_pred} unexpected predicted labels." # noqa: E501
         )
 
-    # Generate classification report
-    report = classification_report(
-        filtered_true_labels,
-        filtered_pred_labels,
-        target_names=required_labels,
-        output_dict=True
-    )
-
     # Extract precision by class
     precision_full_compliance = report["full-compliance"]["precision"]
     precision_minor_non_conformity = report["minor non-conformity"]["precision"]
@@ -164,14 +274,8 @@ def display_classification_report(
 
 def plot_f1_score_chart(true_labels: pd.Series, predicted_labels: pd.Series) -> None:
     """Plot F1-score bar chart for each class."""
-    required_labels = [
-        "full-compliance",
-        "minor non-conformity",
-        "major non-conformity"
-    ]
-
-    # Filter unexpected labels
-    filtered_true_labels, filtered_pred_labels, num_unexpected_true, num_unexpected_pred = filter_unexpected_labels(true_labels, predicted_labels, required_labels) # noqa: E501
+    # Filter unexpected labels and get the report from the shared cache
+    _, _, num_unexpected_true, num_unexpected_pred, report, _, _, _ = _labels_and_report(true_labels, predicted_labels, REQUIRED_LABELS) # noqa: E501
 
     # Display counts of unexpected labels
     if num_unexpected_true > 0 or num_unexpected_pred > 0:
@@ -179,31 +283,33 @@ def plot_f1_score_chart(true_labels: pd.Series, predicted_labels: pd.Series) ->
             f"Filtered out {num_unexpected_true} unexpected true labels and {num_unexpected_pred} unexpected predicted labels." # noqa: E501
         )
 
-    # Generate classification report
-    report = classification_report(
-        filtered_true_labels,
-        filtered_pred_labels,
-        target_names=required_labels,
-        output_dict=True
+    # Extract F1-scores for each class
+    f1_scores = (
+        ("Full Compliance", report["full-compliance"]["f1-score"]),
+        ("Minor Non-conformity", report["minor non-conformity"]["f1-score"]),
+        ("Major Non-conformity", report["major non-conformity"]["f1-score"]),
     )
 
-    # Extract F1-scores for each class
-    f1_scores = {
-        "Full Compliance": report["full-compliance"]["f1-score"],
-        "Minor Non-conformity": report["minor non-conformity"]["f1-score"],
-        "Major Non-conformity": report["major non-conformity"]["f1-score"]
-    }
+    # Display the plot
+    st.image(_render_f1_score_png(f1_scores))
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _render_f1_score_png(f1_scores: tuple[tuple[str, float], ...]) -> bytes:
+    """Render the F1-score bar chart, cached on the scores."""
+    return _PLOT_POOL.submit(_draw_f1_scores, f1_scores).result()
 
-    # Plot F1-scores
-    plt.figure(figsize=(8, 4))
-    plt.bar(
-        f1_scores.keys(),
-        f1_scores.values(),
+
+def _draw_f1_scores(f1_scores: tuple[tuple[str, float], ...]) -> bytes:
+    """Draw the F1-score bar chart on a worker thread."""
+    fig = Figure(figsize=(8, 4))
+    ax = fig.subplots()
+    ax.bar(
+        [name for name, _ in f1_scores],
+        [score for _, score in f1_scores],
         color=["skyblue", "lightgreen", "salmon"]
     )
-    plt.title("F1-scores by Compliance Class")
-    plt.xlabel("Compliance Status")
-    plt.ylabel("F1-score")
-
-    # Display the plot
-    st.pyplot(plt)
+    ax.set_title("F1-scores by Compliance Class")
+    ax.set_xlabel("Compliance Status")
+    ax.set_ylabel("F1-score")
+    return _figure_to_png(fig)